@@ -0,0 +1,35 @@
+import asyncio
+from functools import partial, wraps
+
+from .db_pool import get_executor, run_in_pool
+from .views import CommentViewSet, ReviewViewSet, TitleViewSet
+
+
+def run_view(view, request, **kwargs):
+    """Выполняет синхронное представление DRF и рендерит ответ."""
+    response = view(request, **kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    return response
+
+
+def async_view(view):
+    """
+    Асинхронная обёртка, отдающая работу представления в пул потоков.
+    wraps переносит атрибуты представления, в том числе csrf_exempt,
+    который выставляет as_view() DRF.
+    """
+    @wraps(view)
+    async def wrapper(request, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_executor(),
+            partial(run_in_pool, run_view, view, request, **kwargs)
+        )
+    return wrapper
+
+
+title_list = async_view(TitleViewSet.as_view({'get': 'list'}))
+title_detail = async_view(TitleViewSet.as_view({'get': 'retrieve'}))
+review_list = async_view(ReviewViewSet.as_view({'get': 'list'}))
+comment_list = async_view(CommentViewSet.as_view({'get': 'list'}))
@@ -0,0 +1,66 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+
+from reviews.versioning import CATALOG, get_version
+
+HITS_KEY = 'catalog-cache:hits'
+MISSES_KEY = 'catalog-cache:misses'
+
+
+def normalize_query(query_params):
+    """Параметры запроса в каноническом порядке, без пустых значений."""
+    return urlencode(sorted(
+        (key, value)
+        for key, values in query_params.lists()
+        for value in values
+        if value != ''
+    ))
+
+
+def get_request_digest(request, *parts):
+    return hashlib.md5('|'.join((
+        request.get_host(),
+        request.path,
+        normalize_query(request.query_params),
+    ) + tuple(str(part) for part in parts)).encode()).hexdigest()
+
+
+def get_response_cache_key(request, *parts):
+    version = get_version(CATALOG)
+    return f'catalog-cache:{version}:{get_request_digest(request, *parts)}'
+
+
+def make_etag(request, versions):
+    """Сильный ETag ответа по версиям данных, из которых он построен."""
+    return '"%s"' % get_request_digest(
+        request, request.accepted_media_type, *versions
+    )
+
+
+def count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def get_cache_stats():
+    """Счётчики попаданий и промахов кеша ответов каталога."""
+    return {
+        'hits': cache.get(HITS_KEY, 0),
+        'misses': cache.get(MISSES_KEY, 0),
+    }
+
+
+def get_cached(key):
+    data = cache.get(key)
+    count(MISSES_KEY if data is None else HITS_KEY)
+    return data
+
+
+def set_cached(key, data):
+    cache.set(key, data, timeout=settings.CATALOG_CACHE_TIMEOUT)
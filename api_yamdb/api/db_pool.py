@@ -0,0 +1,52 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Пул потоков для работы с базой из асинхронного кода.
+    Размер пула ограничивает число одновременных запросов к базе,
+    а ожидающие запросы не занимают потоки сервера.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ASYNC_DB_POOL_SIZE,
+                thread_name_prefix='db-pool',
+            )
+    return _executor
+
+
+def run_in_pool(func, *args, **kwargs):
+    """
+    Выполняет func в потоке пула, закрывая соединения с базой так же,
+    как после обычного запроса: потоки пула живут дольше запроса.
+    """
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def run_blocking(func, *args):
+    """
+    Вызывает синхронную функцию, работающую с базой, из любого кода.
+    Вне цикла событий она выполняется сразу. Внутри цикла, где ORM
+    запрещён, — в пуле, но цикл ждёт результата и всё это время
+    заблокирован. Это лишь позволяет потоковым ответам Django 3.2
+    работать под ASGI, а не делает их асинхронными.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return func(*args)
+    return get_executor().submit(run_in_pool, func, *args).result()
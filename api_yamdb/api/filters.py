@@ -1,6 +1,57 @@
 import django_filters
+from django.conf import settings
+from rest_framework import filters
 
+from . import lookups  # noqa: F401
+from .title_index import title_index
 from reviews.models import Title
+from reviews.search import search_titles
+
+
+class CasefoldCharFilter(django_filters.CharFilter):
+    """Фильтр по casefold-колонке: значение сворачивается так же."""
+
+    def filter(self, qs, value):
+        return super().filter(qs, value.casefold() if value else value)
+
+
+class CasefoldSearchFilter(filters.SearchFilter):
+    """
+    Поиск вхождения подстроки в casefold-колонках. Регистр сворачивается
+    в Python для любых букв, поэтому поиск находит кириллицу в любом
+    регистре. Поиск по началу строки через индекс дают фильтры
+    `name__prefix` и `username__prefix`.
+    """
+
+    def get_search_terms(self, request):
+        return [term.casefold() for term in super().get_search_terms(request)]
+
+
+class StableOrderingFilter(filters.OrderingFilter):
+    """
+    Дополняет выбранную клиентом сортировку полем id в том же
+    направлении: страницы не пересекаются, а составные индексы
+    (поле, id) читаются без сортировки во временном B-дереве.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        params = request.query_params.get(self.ordering_param)
+        ordering = super().get_ordering(request, queryset, view)
+        if not params or not ordering:
+            return ordering
+        direction = '-' if ordering[0].startswith('-') else ''
+        return [*ordering, f'{direction}id']
+
+
+class NamePrefixFilter(django_filters.FilterSet):
+    """Поиск категорий и жанров по началу названия через индекс."""
+    name__prefix = CasefoldCharFilter(field_name='name_casefold',
+                                      lookup_expr='prefix')
+
+
+class UsernamePrefixFilter(django_filters.FilterSet):
+    username__prefix = CasefoldCharFilter(field_name='username_casefold',
+                                          lookup_expr='prefix')
 
 
 class TitleFilter(django_filters.FilterSet):
@@ -8,10 +59,40 @@ class TitleFilter(django_filters.FilterSet):
                                       lookup_expr='iexact')
     category = django_filters.CharFilter(field_name='category__slug',
                                          lookup_expr='iexact')
-    name = django_filters.CharFilter(field_name='name',
-                                     lookup_expr='icontains')
+    name = CasefoldCharFilter(field_name='name_casefold',
+                              lookup_expr='contains')
+    name__prefix = CasefoldCharFilter(field_name='name_casefold',
+                                      lookup_expr='prefix')
     year = django_filters.NumberFilter(field_name='year')
+    search = django_filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ['genre', 'category', 'name', 'year']
+        fields = ['genre', 'category', 'name', 'name__prefix', 'year',
+                  'search']
+
+    bitmap_fields = ('genre', 'category', 'year')
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+    def filter_queryset(self, queryset):
+        """
+        При TITLE_FILTER_BACKEND = 'bitmap' жанр, категория и год
+        отбираются индексом в памяти, а в базу уходит только выборка
+        по первичному ключу.
+        """
+        if settings.TITLE_FILTER_BACKEND != 'bitmap':
+            return super().filter_queryset(queryset)
+        data = self.form.cleaned_data
+        ids = title_index.lookup(**{
+            name: data[name] for name in self.bitmap_fields
+            if data.get(name) not in (None, '')
+        })
+        if ids is None:
+            return super().filter_queryset(queryset)
+        queryset = queryset.filter(id__in=ids) if ids else queryset.none()
+        for name, value in data.items():
+            if name not in self.bitmap_fields:
+                queryset = self.filters[name].filter(queryset, value)
+        return queryset
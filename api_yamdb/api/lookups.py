@@ -0,0 +1,22 @@
+from django.db.models import CharField, Lookup
+
+MAX_CHAR = chr(0x10FFFF)
+
+
+@CharField.register_lookup
+class Prefix(Lookup):
+    """
+    Поиск по началу строки через диапазон значений:
+    column >= 'abc' AND column < 'abc' || U+10FFFF.
+    В отличие от LIKE 'abc%' такой запрос использует обычный индекс.
+    """
+    lookup_name = 'prefix'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        upper_params = [value + MAX_CHAR for value in rhs_params]
+        return (
+            f'{lhs} >= {rhs} AND {lhs} < {rhs}',
+            lhs_params + rhs_params + lhs_params + upper_params,
+        )
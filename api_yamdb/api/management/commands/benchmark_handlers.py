@@ -0,0 +1,171 @@
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from statistics import quantiles
+from urllib.parse import urlsplit
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.models import Review
+
+HOST = 'localhost'
+
+
+def make_environ(url):
+    path = urlsplit(url)
+    return {
+        'REQUEST_METHOD': 'GET',
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path.path,
+        'QUERY_STRING': path.query,
+        'SERVER_NAME': HOST,
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': HOST,
+        'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+
+
+def make_scope(url):
+    path = urlsplit(url)
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path.path,
+        'raw_path': path.path.encode(),
+        'query_string': path.query.encode(),
+        'root_path': '',
+        'headers': [(b'host', HOST.encode())],
+        'client': ('127.0.0.1', 0),
+        'server': (HOST, 80),
+    }
+
+
+class Command(BaseCommand):
+    """
+    Нагрузочное сравнение WSGI и ASGI на данных текущей базы.
+    Запросы передаются обработчикам Django напрямую, без сетевого
+    сервера: WSGI обслуживается пулом потоков размером с число
+    одновременных запросов, как многопоточный сервер, ASGI —
+    одним циклом событий с тем же числом одновременных запросов.
+    Под ASGI измеряются и синхронные маршруты, и их асинхронные
+    версии из /api/v1/async/.
+    """
+
+    help = 'Сравнивает пропускную способность WSGI и ASGI.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=2000,
+            help='Количество запросов к каждому адресу.',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=100,
+            help='Количество одновременных запросов.',
+        )
+        parser.add_argument(
+            '--url', action='append', dest='urls',
+            help='Адрес для проверки, можно указать несколько раз.',
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 2 or options['concurrency'] < 1:
+            raise CommandError(
+                'Need at least 2 requests and concurrency of at least 1'
+            )
+        urls = options['urls'] or self.get_default_urls()
+        self.stdout.write(
+            f'{"handler":<8} {"url":<52} {"req/s":>9} '
+            f'{"p50 ms":>8} {"p95 ms":>8} {"errors":>6}'
+        )
+        for url in urls:
+            self.report('wsgi', url, self.run_wsgi(url, **options))
+            self.report(
+                'asgi', url, asyncio.run(self.run_asgi(url, **options))
+            )
+            async_url = url.replace('/api/v1/', '/api/v1/async/', 1)
+            if async_url != url:
+                self.report('asgi', async_url, asyncio.run(
+                    self.run_asgi(async_url, **options)
+                ))
+
+    def get_default_urls(self):
+        review = Review.objects.order_by('title_id', 'id').first()
+        if review is None:
+            raise CommandError('No reviews found, load data first')
+        title_url = f'/api/v1/titles/{review.title_id}/'
+        return [
+            '/api/v1/titles/',
+            title_url,
+            f'{title_url}reviews/',
+            f'{title_url}reviews/{review.id}/comments/',
+        ]
+
+    def run_wsgi(self, url, requests, concurrency, **options):
+        handler = WSGIHandler()
+
+        def call(_):
+            statuses = []
+            started = time.perf_counter()
+            body = handler(
+                make_environ(url),
+                lambda status, headers: statuses.append(status)
+            )
+            b''.join(body)
+            body.close()
+            return (
+                time.perf_counter() - started,
+                statuses[0].startswith('200')
+            )
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(call, range(requests)))
+        return time.perf_counter() - started, results
+
+    async def run_asgi(self, url, requests, concurrency, **options):
+        handler = ASGIHandler()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def call():
+            statuses = []
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    statuses.append(message['status'])
+
+            async with semaphore:
+                started = time.perf_counter()
+                await handler(make_scope(url), receive, send)
+                return time.perf_counter() - started, statuses[0] == 200
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(call() for _ in range(requests)))
+        return time.perf_counter() - started, results
+
+    def report(self, name, url, measurement):
+        elapsed, results = measurement
+        latencies = sorted(latency for latency, _ in results)
+        percentiles = quantiles(latencies, n=20)
+        self.stdout.write(
+            f'{name:<8} {url:<52} {len(results) / elapsed:>9.1f} '
+            f'{percentiles[9] * 1000:>8.1f} {percentiles[18] * 1000:>8.1f} '
+            f'{sum(not ok for _, ok in results):>6}'
+        )
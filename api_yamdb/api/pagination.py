@@ -0,0 +1,179 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import reduce
+from operator import and_, or_
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework import exceptions
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Пагинация по ключу сортировки (keyset / seek).
+    Следующая страница выбирается условием на значения ключа последней
+    записи, поэтому глубокие страницы стоят столько же, сколько первая,
+    а общее количество записей (COUNT) не считается.
+    Ключом служит сортировка, уже заданная запросу, например фильтром
+    `ordering`, а без неё — ordering класса. Ключ должен однозначно
+    упорядочивать записи, поэтому при необходимости к нему добавляется id.
+    Пустые значения (NULL) идут, как в SQLite, раньше любых других.
+    """
+
+    ordering = ('id',)
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Некорректный курсор.'
+    invalid_ordering_message = (
+        'Эта сортировка не поддерживается при пагинации по курсору.'
+    )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = self.get_ordering(queryset)
+        self.fields = [
+            queryset.model._meta.get_field(name.lstrip('-'))
+            for name in self.ordering
+        ]
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.get_seek_filter(position))
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_ordering(self, queryset):
+        """
+        Ключ пагинации по сортировке запроса. Сортировка по выражению,
+        например по релевантности поиска, ключом служить не может.
+        """
+        ordering = list(queryset.query.order_by or self.ordering)
+        try:
+            fields = [
+                queryset.model._meta.get_field(name.lstrip('-'))
+                for name in ordering
+            ]
+        except (AttributeError, FieldDoesNotExist):
+            raise exceptions.ValidationError(
+                {'pagination': [self.invalid_ordering_message]}
+            )
+        if not fields[-1].primary_key:
+            direction = '-' if ordering[0].startswith('-') else ''
+            ordering.append(f'{direction}id')
+        return tuple(ordering)
+
+    def get_seek_filter(self, position):
+        """
+        Условие «строго после позиции» для составного ключа (a, b, c):
+        a >= x AND (a > x OR a = x AND b > y OR a = x AND b = y AND c > z).
+        Граница по первому полю позволяет SQLite начать поиск по индексу
+        с нужной позиции, а не просматривать его с начала.
+        """
+        conditions = []
+        for idx in range(len(self.ordering)):
+            seek = self.get_after(idx, position[idx])
+            if seek is None:
+                continue
+            equal = [
+                self.get_equal(field_idx, value)
+                for field_idx, value in enumerate(position[:idx])
+            ]
+            conditions.append(reduce(and_, equal, seek))
+        if not conditions:
+            return Q(pk__in=[])
+        condition = reduce(or_, conditions)
+        if self.fields[0].null or position[0] is None:
+            return condition
+        bound = self.compare(
+            0, 'lte' if self.ordering[0].startswith('-') else 'gte',
+            position[0]
+        )
+        return bound & condition
+
+    def get_after(self, idx, value):
+        """
+        Условие «поле строго после значения» с учётом NULL, которые
+        меньше любых значений; None, если после значения ничего нет.
+        """
+        name = self.fields[idx].name
+        descending = self.ordering[idx].startswith('-')
+        if value is None:
+            if descending:
+                return None
+            return Q(**{f'{name}__isnull': False})
+        seek = self.compare(idx, 'lt' if descending else 'gt', value)
+        if descending and self.fields[idx].null:
+            seek |= Q(**{f'{name}__isnull': True})
+        return seek
+
+    def get_equal(self, idx, value):
+        if value is None:
+            return Q(**{f'{self.fields[idx].name}__isnull': True})
+        return Q(**{self.fields[idx].name: value})
+
+    def compare(self, idx, lookup, value):
+        return Q(**{f'{self.fields[idx].name}__{lookup}': value})
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            if len(values) != len(self.fields):
+                raise ValueError
+            return [
+                None if value is None and field.null
+                else field.to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance):
+        values = [
+            None if field.value_from_object(instance) is None
+            else field.value_to_string(instance)
+            for field in self.fields
+        ]
+        return urlsafe_b64encode(json.dumps(values).encode()).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.page[-1]),
+        )
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+
+class TitleKeysetPagination(KeysetPagination):
+    ordering = ('year', 'name', 'id')
+
+
+class PubDateKeysetPagination(KeysetPagination):
+    """Отзывы и комментарии от новых к старым."""
+    ordering = ('-pub_date', '-id')
@@ -1,8 +1,11 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
 from django.core.mail import send_mail
+from django.db import IntegrityError, transaction
 from django.http import Http404
-from rest_framework import serializers, validators
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueValidator
 from rest_framework_simplejwt.serializers import (PasswordField,
                                                   TokenObtainPairSerializer)
 
@@ -11,7 +14,66 @@ from reviews.models import Category, Comment, Genre, Review, Title
 User = get_user_model()
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ConstraintErrorsMixin:
+    """
+    Уникальность проверяется ограничениями базы при записи, а не запросами
+    exists() перед ней: так нет лишних обращений к базе, а одновременные
+    запросы не приводят к ошибке 500.
+    Если запись нарушила ограничение, нарушенное правило находится уже
+    после ошибки и возвращается с теми же сообщениями, что давали
+    валидаторы уникальности.
+    """
+    unique_together_messages = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for field in fields.values():
+            field.validators = [
+                validator for validator in field.validators
+                if not isinstance(validator, UniqueValidator)
+            ]
+        return fields
+
+    def save(self, **kwargs):
+        instance = self.instance
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError:
+            errors = self.get_unique_errors(
+                instance, {**self.validated_data, **kwargs}
+            )
+            if not errors:
+                raise
+        raise serializers.ValidationError(errors)
+
+    def get_unique_errors(self, instance, values):
+        model = self.Meta.model
+        queryset = model._default_manager.all()
+        if instance is not None:
+            queryset = queryset.exclude(pk=instance.pk)
+        errors = {}
+        for field in model._meta.fields:
+            if not field.unique or field.primary_key:
+                continue
+            if field.name in values and queryset.filter(
+                **{field.name: values[field.name]}
+            ).exists():
+                errors[field.name] = [field.error_messages['unique'] % {
+                    'model_name': model._meta.verbose_name,
+                    'field_label': field.verbose_name,
+                }]
+        for names, message in self.unique_together_messages.items():
+            if all(name in values for name in names) and queryset.filter(
+                **{name: values[name] for name in names}
+            ).exists():
+                errors.setdefault(
+                    api_settings.NON_FIELD_ERRORS_KEY, []
+                ).append(message)
+        return errors
+
+
+class ReviewSerializer(ConstraintErrorsMixin, serializers.ModelSerializer):
     """
     Сериализатор для модели Review.
     """
@@ -21,20 +83,26 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        fields = ('id', 'text', 'author', 'score', 'pub_date')
-        read_only_fields = ('id', 'author', 'pub_date')
+        fields = (
+            'id', 'text', 'author', 'score', 'pub_date', 'comment_count'
+        )
+        read_only_fields = ('id', 'author', 'pub_date', 'comment_count')
+
+    unique_together_messages = {
+        ('title', 'author'): 'Вы уже оставили отзыв на это произведение.',
+    }
 
-    def validate(self, data):
-        request = self.context['request']
-        if request.method == 'POST':
-            title_id = self.context['view'].kwargs.get('title_id')
-            if Review.objects.filter(
-                    title_id=title_id, author=request.user
-            ).exists():
-                raise serializers.ValidationError(
-                    'Вы уже оставили отзыв на это произведение.'
-                )
-        return data
+
+class ReviewBulkItemSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор одного отзыва из пакетной загрузки.
+    Произведение передаётся id и проверяется для всей пачки сразу.
+    """
+    title = serializers.IntegerField(min_value=1)
+
+    class Meta:
+        model = Review
+        fields = ('title', 'text', 'score')
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -67,13 +135,23 @@ class TitleReadSerializer(serializers.ModelSerializer):
     genre = GenreSerializer(many=True, read_only=True)
     category = CategorySerializer(read_only=True)
     rating = serializers.FloatField(read_only=True)
+    rating_histogram = serializers.SerializerMethodField()
 
     class Meta:
         model = Title
         fields = (
-            'id', 'name', 'year', 'rating', 'description', 'genre', 'category'
+            'id', 'name', 'year', 'rating', 'description', 'genre', 'category',
+            'rating_histogram'
         )
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.context.get('include_histogram'):
+            self.fields.pop('rating_histogram')
+
+    def get_rating_histogram(self, obj):
+        return obj.get_rating_histogram()
+
 
 class TitleWriteSerializer(serializers.ModelSerializer):
     genre = serializers.SlugRelatedField(
@@ -103,7 +181,7 @@ class TitleWriteSerializer(serializers.ModelSerializer):
         return value
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(ConstraintErrorsMixin, serializers.ModelSerializer):
     """Сериализатор для модели пользователя для админа."""
 
     class Meta:
@@ -121,21 +199,8 @@ class UserSerializer(serializers.ModelSerializer):
             'email': {'required': True},
         }
 
-    def validate(self, attrs):
-        if self.instance is not None:
-            if 'email' in attrs and User.objects.filter(
-                email=attrs['email']
-            ).exclude(id=self.instance.id).exists():
-                raise validators.ValidationError('Email уже зарегистрирован')
-            if 'username' in attrs and User.objects.filter(
-                username=attrs['username']
-            ).exclude(id=self.instance.id).exists():
-                raise validators.ValidationError(
-                    'Username уже зарегистрирован')
-        return attrs
-
-
-class UserMeSerializer(serializers.ModelSerializer):
+
+class UserMeSerializer(ConstraintErrorsMixin, serializers.ModelSerializer):
     """Сериализатор для модели пользователя."""
 
     class Meta:
@@ -155,29 +220,18 @@ class UserMeSerializer(serializers.ModelSerializer):
         }
 
 
-class SignupSerializer(serializers.ModelSerializer):
+class SignupSerializer(ConstraintErrorsMixin, serializers.ModelSerializer):
     """Сериализатор для регистрации пользователя."""
 
     class Meta:
         model = User
         fields = ('username', 'email',)
 
-    def validate(self, attrs):
-        if not self.instance:
-            if User.objects.filter(email=attrs['email']).exists():
-                raise serializers.ValidationError(
-                    'Email уже зарегистрирован')
-            if User.objects.filter(username=attrs['username']).exists():
-                raise serializers.ValidationError(
-                    'Username уже зарегистрирован')
-        return attrs
-
     def create(self, validated_data):
         user = User.objects.create_user(
             username=validated_data['username'],
             email=validated_data['email']
         )
-        user.save()
         self.instance = user
         self.make_confirmation_code(validated_data)
 
@@ -0,0 +1,99 @@
+import threading
+from collections import defaultdict
+
+from reviews.models import Title
+from reviews.versioning import TITLE_INDEX, get_version
+
+# Больше идентификаторов в условии IN SQLite не примет, а фильтр
+# по базе для таких широких выборок не медленнее.
+MAX_IDS = 1000
+
+
+def make_bitmap(ids, size):
+    bits = bytearray(size // 8 + 1)
+    for title_id in ids:
+        bits[title_id >> 3] |= 1 << (title_id & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def bitmap_to_ids(bitmap):
+    bits = bin(bitmap)[:1:-1]
+    ids = []
+    position = bits.find('1')
+    while position != -1:
+        ids.append(position)
+        position = bits.find('1', position + 1)
+    return ids
+
+
+class TitleBitmapIndex:
+    """
+    Инвертированный индекс произведений в памяти процесса.
+    Для каждого слага жанра, слага категории и года хранится битовая
+    маска id произведений; комбинированный фильтр считается пересечением
+    масок. Индекс перестраивается при первом запросе после изменения
+    версии каталога.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.lock = threading.Lock()
+        self.genres = {}
+        self.categories = {}
+        self.years = {}
+
+    def build(self):
+        genres, categories, years = (
+            defaultdict(list), defaultdict(list), defaultdict(list)
+        )
+        max_id = 0
+        for title_id, year, category in Title.objects.values_list(
+            'id', 'year', 'category__slug'
+        ).order_by().iterator():
+            max_id = max(max_id, title_id)
+            years[year].append(title_id)
+            if category:
+                categories[category.lower()].append(title_id)
+        for title_id, genre in Title.genre.through.objects.values_list(
+            'title_id', 'genre__slug'
+        ).order_by().iterator():
+            genres[genre.lower()].append(title_id)
+        self.genres, self.categories, self.years = (
+            {key: make_bitmap(ids, max_id) for key, ids in index.items()}
+            for index in (genres, categories, years)
+        )
+
+    def refresh(self):
+        version = get_version(TITLE_INDEX)
+        if version == self.version:
+            return
+        with self.lock:
+            if version != self.version:
+                self.build()
+                self.version = version
+
+    def lookup(self, genre=None, category=None, year=None):
+        """
+        Пересечение масок по заданным условиям.
+        Возвращает список id или None, если условий нет либо
+        подходящих произведений слишком много для фильтра по id.
+        """
+        self.refresh()
+        bitmaps = []
+        if genre:
+            bitmaps.append(self.genres.get(genre.lower(), 0))
+        if category:
+            bitmaps.append(self.categories.get(category.lower(), 0))
+        if year is not None:
+            bitmaps.append(self.years.get(int(year), 0))
+        if not bitmaps:
+            return None
+        bitmap = bitmaps[0]
+        for other in bitmaps[1:]:
+            bitmap &= other
+        if bin(bitmap).count('1') > MAX_IDS:
+            return None
+        return bitmap_to_ids(bitmap)
+
+
+title_index = TitleBitmapIndex()
@@ -1,12 +1,16 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from . import async_views
 from .views import (
+    CacheStatsView,
     CategoryViewSet,
+    ChangesView,
     CommentViewSet,
     GenreViewSet,
     MyTokenObtainPairView,
     RegisterView,
+    ReviewBulkView,
     ReviewViewSet,
     TitleViewSet,
     UsersMeView,
@@ -29,11 +33,31 @@ router.register('genres', GenreViewSet, basename='genres')
 router.register('titles', TitleViewSet, basename='titles')
 router.register('users', UsersViewSet, basename='users')
 
+async_urlpatterns = [
+    path('titles/', async_views.title_list, name='async_titles'),
+    path(
+        'titles/<int:pk>/', async_views.title_detail,
+        name='async_title_detail'
+    ),
+    path(
+        'titles/<int:title_id>/reviews/', async_views.review_list,
+        name='async_reviews'
+    ),
+    path(
+        'titles/<int:title_id>/reviews/<int:review_id>/comments/',
+        async_views.comment_list, name='async_comments'
+    ),
+]
+
 urlpatterns = [
     path('v1/auth/token/',
          MyTokenObtainPairView.as_view(),
          name='token_obtain_pair'),
     path('v1/auth/signup/', RegisterView.as_view(), name='signup'),
     path('v1/users/me/', UsersMeView.as_view(), name='users_me'),
+    path('v1/reviews/bulk/', ReviewBulkView.as_view(), name='reviews_bulk'),
+    path('v1/changes/', ChangesView.as_view(), name='changes'),
+    path('v1/cache-stats/', CacheStatsView.as_view(), name='cache_stats'),
+    path('v1/async/', include(async_urlpatterns)),
     path('v1/', include(router.urls)),
 ]
@@ -1,12 +1,28 @@
+import json
+from collections import defaultdict
+from http import HTTPStatus
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, generics, permissions, views, viewsets
+from rest_framework import generics, permissions, views, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 from rest_framework_simplejwt.views import TokenObtainPairView
 
-from .filters import TitleFilter
+from .cache import get_cache_stats
+from .db_pool import run_blocking
+from .filters import (
+    CasefoldSearchFilter, NamePrefixFilter, StableOrderingFilter, TitleFilter,
+    UsernamePrefixFilter
+)
+from .pagination import PubDateKeysetPagination, TitleKeysetPagination
 from .permissions import (
     IsAdminOrReadOnly, IsAuthorOrModeratorOrAdmin, IsOnlyAdmins
 )
@@ -15,6 +31,7 @@ from .serializers import (
     CommentSerializer,
     GenreSerializer,
     MyTokenObtainPairSerializer,
+    ReviewBulkItemSerializer,
     ReviewSerializer,
     SignupSerializer,
     TitleReadSerializer,
@@ -22,84 +39,475 @@ from .serializers import (
     UserMeSerializer,
     UserSerializer
 )
-from .viewsets import CreateListDestroyViewSet
-from reviews.models import Category, Genre, Review, Title
+from .viewsets import (
+    CatalogCacheMixin, ConditionalGetMixin, CreateListDestroyViewSet,
+    PaginationModeMixin
+)
+from reviews.models import (
+    Category, ChangeLog, Comment, Genre, Review, Title
+)
+from reviews.services import bulk_create_reviews, get_top_titles
+from reviews.versioning import USERS, get_version
 
 User = get_user_model()
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, PaginationModeMixin,
+                    viewsets.ModelViewSet):
     """
     Вьюсет для отзывов на произведения.
     Доступен для аутентифицированных пользователей.
     """
     serializer_class = ReviewSerializer
     permission_classes = [IsAuthorOrModeratorOrAdmin]
+    pagination_modes = {'cursor': PubDateKeysetPagination}
     http_method_names = ['get', 'post', 'patch', 'delete']
 
+    def get_etag_versions(self):
+        return [
+            get_version('reviews', self.kwargs.get('title_id')),
+            get_version(USERS),
+        ]
+
+    def get_title(self):
+        """Произведение из URL, загружается не больше раза за запрос."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, id=self.kwargs.get('title_id')
+            )
+        return self._title
+
     def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        return Review.objects.filter(
+            title_id=self.kwargs.get('title_id')
+        ).select_related('author')
+
+    def paginate_queryset(self, queryset):
+        """
+        Непустая страница подтверждает существование произведения,
+        поэтому оно проверяется отдельным запросом только для пустой.
+        """
+        page = super().paginate_queryset(queryset)
+        if not page:
+            self.get_title()
+        return page
 
+    @transaction.atomic
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user, title=self.get_title())
+
+    @action(detail=False)
+    def export(self, request, title_id=None):
+        """
+        Все отзывы произведения потоком в формате NDJSON — по объекту
+        в строке, без пагинации и подсчёта; `include=comments` добавляет
+        к каждому отзыву его комментарии.
+        Рассчитана на WSGI. Django 3.2 под ASGI перебирает потоковый
+        ответ в цикле событий, и каждая порция после первой блокирует
+        цикл на время своего запроса, задерживая все остальные запросы
+        процесса. Первая порция читается до отправки ответа, в потоке
+        представления, поэтому выгрузка в одну порцию цикл не блокирует.
+        """
+        self.get_title()
+        include_comments = 'comments' in request.query_params.getlist(
+            'include'
+        )
+        return StreamingHttpResponse(
+            self.export_rows(
+                include_comments,
+                self.get_export_chunk(None, include_comments)
+            ),
+            content_type='application/x-ndjson'
+        )
+
+    def export_rows(self, include_comments, chunk):
+        """
+        Читает отзывы порциями по ключу (pub_date, id), поэтому память
+        не растёт с их числом; комментарии загружаются одним запросом
+        на порцию. Порции после первой читаются через run_blocking,
+        иначе под ASGI ORM падает с SynchronousOnlyOperation.
+        """
+        review_serializer = ReviewSerializer()
+        comment_serializer = CommentSerializer()
+        reviews, comments = chunk
+        while reviews:
+            for review in reviews:
+                data = review_serializer.to_representation(review)
+                if include_comments:
+                    data['comments'] = [
+                        comment_serializer.to_representation(comment)
+                        for comment in comments[review.id]
+                    ]
+                yield json.dumps(
+                    data, cls=JSONEncoder, ensure_ascii=False
+                ) + '\n'
+            if len(reviews) < settings.EXPORT_CHUNK_SIZE:
+                return
+            reviews, comments = run_blocking(
+                self.get_export_chunk, reviews[-1], include_comments
+            )
+
+    def get_export_chunk(self, last, include_comments):
+        """Порция отзывов после last и их комментарии по id отзыва."""
+        reviews = self.get_queryset().order_by('-pub_date', '-id')
+        if last is not None:
+            reviews = reviews.filter(
+                Q(pub_date__lt=last.pub_date)
+                | Q(pub_date=last.pub_date, id__lt=last.id)
+            )
+        reviews = list(reviews[:settings.EXPORT_CHUNK_SIZE])
+        comments = defaultdict(list)
+        if include_comments and reviews:
+            for comment in Comment.objects.filter(
+                review__in=reviews
+            ).select_related('author'):
+                comments[comment.review_id].append(comment)
+        return reviews, comments
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
 
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
 
-class CommentViewSet(viewsets.ModelViewSet):
+
+class ReviewBulkView(views.APIView):
+    """
+    Пакетная загрузка отзывов текущего пользователя на разные произведения.
+    Принимает список объектов {title, text, score} и возвращает результат
+    для каждого элемента в том же порядке: id созданного отзыва
+    или ошибки. Некорректные элементы не мешают сохранить остальные.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {'detail': 'Ожидается список отзывов.'},
+                status=HTTPStatus.BAD_REQUEST
+            )
+        if len(items) > settings.REVIEWS_BULK_MAX_SIZE:
+            return Response(
+                {'detail': 'В одной пачке можно передать не больше '
+                           f'{settings.REVIEWS_BULK_MAX_SIZE} отзывов.'},
+                status=HTTPStatus.BAD_REQUEST
+            )
+        results = [None] * len(items)
+        reviews = self.build_reviews(items, results)
+        try:
+            bulk_create_reviews(list(reviews.values()))
+        except IntegrityError:
+            return Response(
+                {'detail': 'Отзывы изменились во время загрузки, '
+                           'повторите запрос.'},
+                status=HTTPStatus.CONFLICT
+            )
+        for idx, review in reviews.items():
+            results[idx] = {'status': HTTPStatus.CREATED, 'id': review.id}
+        return Response({'results': results})
+
+    def build_reviews(self, items, results):
+        """
+        Проверяет пачку: поля каждого элемента, существование произведений
+        одним запросом и уникальность отзыва автора ещё одним.
+        Ошибки записываются в results, возвращаются отзывы для сохранения.
+        """
+        valid = {}
+        for idx, item in enumerate(items):
+            serializer = ReviewBulkItemSerializer(data=item)
+            if serializer.is_valid():
+                valid[idx] = serializer.validated_data
+            else:
+                results[idx] = {
+                    'status': HTTPStatus.BAD_REQUEST,
+                    'errors': serializer.errors,
+                }
+        title_ids = set(Title.objects.filter(
+            id__in={data['title'] for data in valid.values()}
+        ).values_list('id', flat=True))
+        reviewed = set(Review.objects.filter(
+            author=self.request.user, title_id__in=title_ids
+        ).values_list('title_id', flat=True))
+        reviews = {}
+        for idx, data in valid.items():
+            if data['title'] not in title_ids:
+                results[idx] = {
+                    'status': HTTPStatus.NOT_FOUND,
+                    'errors': {'title': ['Произведение не найдено.']},
+                }
+            elif data['title'] in reviewed:
+                results[idx] = {
+                    'status': HTTPStatus.CONFLICT,
+                    'errors': {'title': [
+                        'Вы уже оставили отзыв на это произведение.'
+                    ]},
+                }
+            else:
+                reviewed.add(data['title'])
+                reviews[idx] = Review(
+                    title_id=data['title'], author=self.request.user,
+                    text=data['text'], score=data['score']
+                )
+        return reviews
+
+
+class CommentViewSet(ConditionalGetMixin, PaginationModeMixin,
+                     viewsets.ModelViewSet):
     """
     Вьюсет для комментариев к отзывам.
     Доступен для аутентифицированных пользователей.
     """
     serializer_class = CommentSerializer
     permission_classes = [IsAuthorOrModeratorOrAdmin]
+    pagination_modes = {'cursor': PubDateKeysetPagination}
     http_method_names = ['get', 'post', 'patch', 'delete']
 
+    def get_etag_versions(self):
+        return [
+            get_version('comments', self.kwargs.get('review_id')),
+            get_version(USERS),
+        ]
+
+    def get_review(self):
+        """
+        Отзыв из URL вместе с произведением: цепочка title_id → review_id
+        проверяется одним запросом с JOIN и запоминается на время запроса.
+        """
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review.objects.select_related('title'),
+                id=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id')
+            )
+        return self._review
+
     def get_queryset(self):
-        review = get_object_or_404(
-            Review, id=self.kwargs.get('review_id'),
-            title_id=self.kwargs.get('title_id')
-        )
-        return review.comments.all()
+        return Comment.objects.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id')
+        ).select_related('author')
+
+    def paginate_queryset(self, queryset):
+        """
+        Непустая страница подтверждает существование отзыва,
+        поэтому он проверяется отдельным запросом только для пустой.
+        """
+        page = super().paginate_queryset(queryset)
+        if not page:
+            self.get_review()
+        return page
 
+    @transaction.atomic
     def perform_create(self, serializer):
-        review = get_object_or_404(
-            Review, id=self.kwargs.get('review_id'),
-            title_id=self.kwargs.get('title_id')
-        )
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_review())
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
 
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
 
-class CategoryViewSet(CreateListDestroyViewSet):
+
+class CategoryViewSet(ConditionalGetMixin, CreateListDestroyViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAdminOrReadOnly]
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ('name',)
+    filter_backends = (DjangoFilterBackend, CasefoldSearchFilter)
+    filterset_class = NamePrefixFilter
+    search_fields = ('name_casefold',)
     lookup_field = 'slug'
 
 
-class GenreViewSet(CreateListDestroyViewSet):
+class GenreViewSet(ConditionalGetMixin, CreateListDestroyViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = [IsAdminOrReadOnly]
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ('name',)
+    filter_backends = (DjangoFilterBackend, CasefoldSearchFilter)
+    filterset_class = NamePrefixFilter
+    search_fields = ('name_casefold',)
     lookup_field = 'slug'
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(rating=Avg('reviews__score'))
+class TitleViewSet(ConditionalGetMixin, CatalogCacheMixin,
+                   PaginationModeMixin, viewsets.ModelViewSet):
+    queryset = Title.objects.select_related('category').prefetch_related(
+        'genre'
+    )
     permission_classes = [IsAdminOrReadOnly]
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [DjangoFilterBackend, StableOrderingFilter]
     filterset_class = TitleFilter
+    ordering_fields = ('rating', 'review_count', 'year', 'name')
+    pagination_modes = {'cursor': TitleKeysetPagination}
+    etag_actions = ('list', 'retrieve', 'top')
     http_method_names = ['get', 'post', 'delete', 'patch']
 
+    def include_histogram(self):
+        return (
+            self.action in ('list', 'retrieve')
+            and 'rating_histogram' in self.request.query_params.getlist(
+                'include'
+            )
+        )
+
+    def get_queryset(self):
+        if self.action == 'rating_histogram':
+            return Title.objects.prefetch_related('score_counts')
+        queryset = super().get_queryset()
+        if self.include_histogram():
+            queryset = queryset.prefetch_related('score_counts')
+        return queryset
+
     def get_serializer_class(self):
-        if self.action in ('list', 'retrieve'):
+        if self.action in ('list', 'retrieve', 'top'):
             return TitleReadSerializer
         return TitleWriteSerializer
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['include_histogram'] = self.include_histogram()
+        return context
+
+    @action(detail=True, url_path='rating-histogram')
+    def rating_histogram(self, request, pk=None):
+        title = self.get_object()
+        return Response({
+            'id': title.id,
+            'review_count': title.review_count,
+            'histogram': title.get_rating_histogram(),
+        })
+
+    @action(detail=False)
+    def top(self, request):
+        """
+        Лучшие по рейтингу произведения каталога, категории (`category`)
+        или жанра (`genre`) из предрасчитанных списков.
+        """
+        key = 'all'
+        for name in ('genre', 'category'):
+            slug = request.query_params.get(name)
+            if slug:
+                key = f'{name}:{slug.lower()}'
+                break
+        ids = get_top_titles().get(key, [])
+        titles = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer(
+            [titles[title_id] for title_id in ids if title_id in titles],
+            many=True
+        )
+        return Response(serializer.data)
+
+
+class ChangesView(views.APIView):
+    """
+    Лента изменений произведений, отзывов и комментариев для
+    инкрементальной синхронизации клиентов.
+    `since` — курсор из поля `next` предыдущего ответа, без него лента
+    начинается с первого изменения. Несколько изменений одного объекта
+    на странице сворачиваются в последнее (созданный и затем изменённый
+    объект остаётся созданным). Созданные и изменённые объекты выводятся
+    в текущем состоянии, удалённые — надгробием без данных.
+    SQLite выполняет пишущие транзакции по очереди, поэтому порядок
+    записей журнала совпадает с порядком фиксации.
+    """
+    querysets = {
+        'title': Title.objects.select_related('category').prefetch_related(
+            'genre'
+        ),
+        'review': Review.objects.select_related('author'),
+        'comment': Comment.objects.select_related('author'),
+    }
+
+    def get(self, request):
+        since = self.get_since(request)
+        page_size = settings.CHANGES_PAGE_SIZE
+        changes = list(
+            ChangeLog.objects.filter(id__gt=since)[:page_size + 1]
+        )
+        has_more = len(changes) > page_size
+        changes = changes[:page_size]
+        latest = {}
+        for change in changes:
+            previous = latest.pop((change.model, change.object_id), None)
+            if previous and previous.action == ChangeLog.CREATED and (
+                change.action == ChangeLog.UPDATED
+            ):
+                change.action = ChangeLog.CREATED
+            latest[change.model, change.object_id] = change
+        objects = self.get_objects(
+            change for change in latest.values()
+            if change.action != ChangeLog.DELETED
+        )
+        results = []
+        for key, change in latest.items():
+            entry = {
+                'sequence': change.id,
+                'type': change.model,
+                'id': change.object_id,
+                'action': change.action,
+                'changed_at': change.changed_at,
+            }
+            if change.action != ChangeLog.DELETED:
+                if key not in objects:
+                    # Объект удалён позже, надгробие будет на следующих
+                    # страницах.
+                    continue
+                entry['data'] = self.serialize(objects[key])
+            results.append(entry)
+        return Response({
+            'next': changes[-1].id if changes else since,
+            'has_more': has_more,
+            'results': results,
+        })
+
+    def get_since(self, request):
+        since = request.query_params.get('since') or '0'
+        if not since.isdigit():
+            raise ValidationError({'since': ['Некорректный курсор.']})
+        return int(since)
+
+    def get_objects(self, changes):
+        """Текущие объекты изменений, по одному запросу на модель."""
+        ids = defaultdict(list)
+        for change in changes:
+            ids[change.model].append(change.object_id)
+        return {
+            (model, object_id): instance
+            for model, object_ids in ids.items()
+            for object_id, instance in self.querysets[model].in_bulk(
+                object_ids
+            ).items()
+        }
+
+    def serialize(self, instance):
+        if isinstance(instance, Title):
+            return TitleReadSerializer(instance).data
+        if isinstance(instance, Review):
+            return {
+                'title': instance.title_id,
+                **ReviewSerializer(instance).data,
+            }
+        return {
+            'review': instance.review_id,
+            **CommentSerializer(instance).data,
+        }
+
+
+class CacheStatsView(views.APIView):
+    """
+    Счётчики попаданий и промахов кеша ответов каталога. Счётчики
+    хранятся в самом кеше, поэтому с общим бэкендом они суммируются
+    по всем процессам.
+    """
+    permission_classes = [IsOnlyAdmins]
+
+    def get(self, request):
+        return Response(get_cache_stats())
+
 
 class MyTokenObtainPairView(TokenObtainPairView):
     serializer_class = MyTokenObtainPairSerializer
@@ -110,8 +518,9 @@ class UsersViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsOnlyAdmins]
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ('username',)
+    filter_backends = (DjangoFilterBackend, CasefoldSearchFilter)
+    filterset_class = UsernamePrefixFilter
+    search_fields = ('username_casefold',)
     http_method_names = ['get', 'post', 'patch', 'delete']
 
 
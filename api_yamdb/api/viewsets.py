@@ -1,4 +1,9 @@
-from rest_framework import mixins, viewsets
+from django.utils.http import parse_etags
+from rest_framework import mixins, status, viewsets
+from rest_framework.response import Response
+
+from .cache import get_cached, get_response_cache_key, make_etag, set_cached
+from reviews.versioning import CATALOG, get_version
 
 
 class CreateListDestroyViewSet(mixins.CreateModelMixin,
@@ -6,3 +11,93 @@ class CreateListDestroyViewSet(mixins.CreateModelMixin,
                                mixins.DestroyModelMixin,
                                viewsets.GenericViewSet):
     pass
+
+
+class PaginationModeMixin:
+    """
+    Позволяет клиенту выбрать режим пагинации параметром `pagination`.
+    Без параметра используется пагинация по умолчанию.
+    """
+    pagination_query_param = 'pagination'
+    pagination_modes = {}
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            mode = self.request.query_params.get(self.pagination_query_param)
+            if mode in self.pagination_modes:
+                self._paginator = self.pagination_modes[mode]()
+        return super().paginator
+
+
+class CatalogCacheMixin:
+    """
+    Кеширует ответы list и retrieve до следующего изменения каталога.
+    Ключ содержит версию каталога, поэтому устаревшие ответы
+    не отдаются и не требуют ручной инвалидации.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        key = get_response_cache_key(request, self.action)
+        data = get_cached(key)
+        if data is not None:
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            set_cached(key, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class NotModified(Exception):
+    pass
+
+
+class ConditionalGetMixin:
+    """
+    Отдаёт ETag для list и retrieve и отвечает 304 Not Modified,
+    если версия данных не изменилась. Проверка выполняется после
+    проверки прав, но до обращения к базе данных и сериализатора.
+    """
+    etag_versions = ((CATALOG,),)
+    etag_actions = ('list', 'retrieve')
+    etag = None
+
+    def get_etag_versions(self):
+        return [get_version(*parts) for parts in self.etag_versions]
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action not in self.etag_actions:
+            return
+        self.etag = make_etag(request, self.get_etag_versions())
+        if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+        if self.etag in if_none_match or '*' in if_none_match:
+            raise NotModified
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if self.etag and response.status_code in (
+            status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED
+        ):
+            response['ETag'] = self.etag
+        return response
@@ -1,3 +1,4 @@
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -66,6 +67,37 @@ DATABASES = {
     }
 }
 
+# Версии данных и кеш ответов каталога хранятся здесь. При запуске
+# нескольких процессов нужен общий бэкенд (Memcached, база данных),
+# иначе каждый процесс увидит только собственные изменения и будет
+# отдавать устаревшие ответы и 304 до истечения CATALOG_CACHE_TIMEOUT.
+CACHE_BACKEND = os.getenv(
+    'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+)
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+if CACHE_BACKEND.endswith('.LocMemCache'):
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': 10000}
+
+CATALOG_CACHE_TIMEOUT = 60 * 60 * 24
+
+# 'database' или 'bitmap' — индекс жанров, категорий и годов в памяти.
+TITLE_FILTER_BACKEND = 'database'
+
+REVIEWS_BULK_MAX_SIZE = 1000
+
+# Отзывов в одной порции потоковой выгрузки.
+EXPORT_CHUNK_SIZE = 500
+
+CHANGES_PAGE_SIZE = 100
+
+# Потоки для работы с базой из асинхронных представлений под ASGI.
+ASYNC_DB_POOL_SIZE = 8
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def repair_title_search(sender, using, **kwargs):
+    from django.db import connections
+
+    from reviews.search import install_title_search
+    install_title_search(connections[using], create=False)
 
 
 class ReviewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reviews'
+
+    def ready(self):
+        from reviews import signals  # noqa: F401
+        post_migrate.connect(repair_title_search, sender=self)
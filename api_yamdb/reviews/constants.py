@@ -1,2 +1,6 @@
 MAX_NAME_LENGTH = 256
 MAX_SLUG_LENGTH = 50
+MIN_SCORE = 1
+MAX_SCORE = 10
+SCORE_RANGE = range(MIN_SCORE, MAX_SCORE + 1)
+TOP_TITLES_SIZE = 10
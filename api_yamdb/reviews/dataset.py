@@ -0,0 +1,773 @@
+import csv
+import json
+import multiprocessing
+import os
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from hashlib import blake2b
+
+import django
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from reviews.models import (
+    Category, ChangeLog, Comment, Genre, ImportFingerprint, Review, Title,
+    User
+)
+from reviews.services import (
+    rebuild_comment_counts, rebuild_title_scores, record_changes,
+    refresh_comment_count, refresh_title_scores
+)
+from reviews.versioning import CATALOG, TITLE_INDEX, USERS, bump_version
+
+DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'static', 'data'
+)
+
+
+def parse_text(value):
+    return value
+
+
+def parse_int(value):
+    return int(value)
+
+
+def parse_optional_int(value):
+    return int(value) if value else None
+
+
+def parse_timestamp(value):
+    timestamp = parse_datetime(value)
+    if timestamp is None:
+        raise ValueError(f'Invalid timestamp: {value!r}')
+    return timestamp
+
+
+def format_timestamp(value):
+    """Дата в формате выгрузки: UTC с суффиксом Z."""
+    value = value.astimezone(timezone.utc)
+    return value.isoformat(
+        timespec='microseconds' if value.microsecond % 1000
+        else 'milliseconds'
+    ).replace('+00:00', 'Z')
+
+
+def format_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return format_timestamp(value)
+    return value
+
+
+class CsvStream:
+    """
+    Потоковое чтение CSV-файла с учётом позиции: после каждой строки
+    offset указывает на байт, с которого начинается следующая, а line —
+    на её номер. Чтение можно продолжить с сохранённой позиции,
+    не разбирая уже обработанные строки.
+    """
+
+    def __init__(self, path, offset=0, line=1):
+        self.path = path
+        self.offset = offset
+        self.line = line
+
+    def __iter__(self):
+        with open(self.path, 'rb') as file:
+            header = next(
+                csv.reader([file.readline().decode('utf-8-sig')]), []
+            )
+            if self.offset:
+                file.seek(self.offset)
+            else:
+                self.offset, self.line = file.tell(), 2
+            reader = csv.reader(self.read_lines(file))
+            while True:
+                line = self.line
+                values = next(reader, None)
+                if values is None:
+                    return
+                if values:
+                    yield line, dict(zip(header, values))
+
+    def read_lines(self, file):
+        for line in iter(file.readline, b''):
+            self.offset += len(line)
+            self.line += 1
+            yield line.decode('utf-8')
+
+
+def read_checkpoint(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def write_json(path, data):
+    """Записывает JSON-файл атомарно: через временный файл."""
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False, indent=2)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+class CsvTable:
+    """
+    Описание CSV-файла выгрузки.
+    columns сопоставляет столбцам файла поле модели и функцию разбора
+    значения, parents — внешним ключам модели их целевые модели,
+    unique перечисляет наборы полей с уникальными значениями,
+    casefold — поля с casefold-копиями, которые заполняет save(),
+    validated — поля, значения которых проверяются валидаторами модели.
+    """
+
+    def __init__(self, filename, model, columns, parents=None, unique=(),
+                 casefold=None, optional=(), validated=()):
+        self.filename = filename
+        self.model = model
+        self.columns = columns
+        self.parents = parents or {}
+        self.unique = unique
+        self.casefold = casefold or {}
+        self.optional = optional
+        self.validators = {
+            field: model._meta.get_field(field).validators
+            for field in validated
+        }
+
+    def __str__(self):
+        return self.filename
+
+    def parse(self, row):
+        """Значения полей по строке CSV или ValueError."""
+        values = {}
+        for column, (field, parser) in self.columns.items():
+            if row.get(column) is None:
+                if column in self.optional:
+                    continue
+                raise ValueError(f'Missing column {column!r}')
+            values[field] = parser(row[column])
+        for field, validators in self.validators.items():
+            for validator in validators:
+                try:
+                    validator(values[field])
+                except ValidationError as error:
+                    raise ValueError(
+                        f'Invalid {field} {values[field]!r}: '
+                        f'{" ".join(error.messages)}'
+                    )
+        for source, target in self.casefold.items():
+            values[target] = values[source].casefold()
+        return values
+
+    def get_digest(self, row):
+        """64-битный хеш значений строки CSV для режима upsert."""
+        data = '\x1f'.join(row.get(column) or '' for column in self.columns)
+        return int.from_bytes(
+            blake2b(data.encode(), digest_size=8).digest(), 'big',
+            signed=True
+        )
+
+
+TABLES = (
+    CsvTable(
+        'users.csv', User,
+        {
+            'id': ('id', parse_int),
+            'username': ('username', parse_text),
+            'email': ('email', parse_text),
+            'role': ('role', parse_text),
+            'bio': ('bio', parse_text),
+            'first_name': ('first_name', parse_text),
+            'last_name': ('last_name', parse_text),
+        },
+        unique=(('username',), ('email',)),
+        casefold={'username': 'username_casefold'},
+        validated=('username', 'email'),
+    ),
+    CsvTable(
+        'category.csv', Category,
+        {
+            'id': ('id', parse_int),
+            'name': ('name', parse_text),
+            'slug': ('slug', parse_text),
+        },
+        unique=(('slug',),),
+        casefold={'name': 'name_casefold'},
+    ),
+    CsvTable(
+        'genre.csv', Genre,
+        {
+            'id': ('id', parse_int),
+            'name': ('name', parse_text),
+            'slug': ('slug', parse_text),
+        },
+        unique=(('slug',),),
+        casefold={'name': 'name_casefold'},
+    ),
+    CsvTable(
+        'titles.csv', Title,
+        {
+            'id': ('id', parse_int),
+            'name': ('name', parse_text),
+            'year': ('year', parse_int),
+            'category': ('category_id', parse_optional_int),
+            'description': ('description', parse_text),
+        },
+        parents={'category_id': Category},
+        casefold={'name': 'name_casefold'},
+        optional=('description',),
+        validated=('year',),
+    ),
+    CsvTable(
+        'genre_title.csv', Title.genre.through,
+        {
+            'id': ('id', parse_int),
+            'title_id': ('title_id', parse_int),
+            'genre_id': ('genre_id', parse_int),
+        },
+        parents={'title_id': Title, 'genre_id': Genre},
+        unique=(('title_id', 'genre_id'),),
+    ),
+    CsvTable(
+        'review.csv', Review,
+        {
+            'id': ('id', parse_int),
+            'title_id': ('title_id', parse_int),
+            'text': ('text', parse_text),
+            'author': ('author_id', parse_int),
+            'score': ('score', parse_int),
+            'pub_date': ('pub_date', parse_timestamp),
+        },
+        parents={'title_id': Title, 'author_id': User},
+        unique=(('title_id', 'author_id'),),
+        validated=('score',),
+    ),
+    CsvTable(
+        'comments.csv', Comment,
+        {
+            'id': ('id', parse_int),
+            'review_id': ('review_id', parse_int),
+            'text': ('text', parse_text),
+            'author': ('author_id', parse_int),
+            'pub_date': ('pub_date', parse_timestamp),
+        },
+        parents={'review_id': Review, 'author_id': User},
+    ),
+)
+
+TABLES_BY_FILENAME = {table.filename: table for table in TABLES}
+
+LOGGED_MODELS = (Title, Review, Comment)
+
+# Внешние ключи, по которым пересчитываются счётчики после upsert:
+# рейтинг произведения зависит от отзывов, а его жанры — от genre_title.
+AGGREGATED_PARENTS = {
+    Title.genre.through: (Title, 'title_id'),
+    Review: (Title, 'title_id'),
+    Comment: (Review, 'review_id'),
+}
+
+
+def parse_id(row):
+    try:
+        return int(row.get('id'))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_rows(table, rows):
+    """
+    Разбирает строки CSV: для каждой возвращает номер строки в файле,
+    id объекта, хеш строки, значения полей и текст ошибки, если строку
+    разобрать не удалось.
+    """
+    results = []
+    for line, row in rows:
+        key = (line, parse_id(row), table.get_digest(row))
+        try:
+            results.append(key + (table.parse(row), None))
+        except ValueError as error:
+            results.append(key + (None, str(error)))
+    return results
+
+
+def parse_chunk(filename, rows):
+    """Разбор порции строк в процессе-обработчике."""
+    return parse_rows(TABLES_BY_FILENAME[filename], rows)
+
+
+def export_table(table, directory, chunk_size):
+    """
+    Записывает таблицу в CSV в формате выгрузки и возвращает количество
+    строк. Строки читаются через iterator() порциями по chunk_size,
+    файл пишется во временный и переименовывается по готовности.
+    """
+    path = os.path.join(directory, table.filename)
+    temporary = f'{path}.tmp'
+    rows = 0
+    with open(temporary, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file, lineterminator='\n')
+        writer.writerow(table.columns)
+        for values in table.model._default_manager.order_by('id').values_list(
+            *(field for field, _ in table.columns.values())
+        ).iterator(chunk_size):
+            writer.writerow([format_value(value) for value in values])
+            rows += 1
+    os.replace(temporary, path)
+    return rows
+
+
+@contextmanager
+def keep_pub_dates():
+    """
+    Отключает auto_now_add у дат публикации, чтобы при загрузке
+    сохранились даты из выгрузки, а не время импорта.
+    """
+    fields = [
+        model._meta.get_field('pub_date') for model in (Review, Comment)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def finish_import():
+    """
+    Пересчитывает то, что при сохранении через save() обновляют сигналы:
+    рейтинги, гистограммы и счётчики комментариев, версии кешей.
+    """
+    rebuild_title_scores()
+    rebuild_comment_counts()
+    for key in (CATALOG, TITLE_INDEX, USERS):
+        bump_version(key)
+
+
+def finish_upsert(touched):
+    """
+    Пересчитывает рейтинги, гистограммы и счётчики комментариев только
+    у произведений и отзывов, которых коснулись изменения.
+    touched сопоставляет модели Title и Review множества id.
+    """
+    for title_id in sorted(touched[Title]):
+        refresh_title_scores(title_id)
+    for review_id in sorted(touched[Review]):
+        refresh_comment_count(review_id)
+    for key in (CATALOG, TITLE_INDEX, USERS):
+        bump_version(key)
+
+
+class BulkLoader:
+    """
+    Загрузка выгрузки через bulk_create порциями.
+    Внешние ключи проверяются по множествам id, которые строятся
+    один раз: из базы и по мере вставки строк. Строки с уже занятым id
+    или нарушающие уникальность пропускаются с ошибкой, как и строки
+    с некорректными значениями или ссылками.
+    Файлы читаются потоком, в памяти держится только текущая порция.
+    Без checkpoint вся загрузка идёт одной транзакцией. С checkpoint
+    каждая порция фиксируется отдельно, а в файл контрольной точки
+    записывается позиция после неё; повторный запуск продолжает
+    с этой позиции. Если процесс прервался между фиксацией порции
+    и записью точки, порция читается заново и её строки пропускаются
+    как уже существующие.
+    С workers строки разбирают процессы-обработчики, по порции
+    на задачу, а проверки ссылок и уникальности и вставка остаются
+    в основном процессе: файлы загружаются по одному в порядке TABLES,
+    чтобы родительские строки вставлялись раньше дочерних. Порции
+    обрабатываются в порядке чтения, обработчики опережают запись
+    не больше чем на две порции каждый. Обработчики всегда запускаются
+    методом spawn и настраивают Django сами: fork поддерживается
+    не везде и копирует открытые соединения с базой и потоки пула.
+    С validate_only выполняются все те же проверки, но в базу ничего
+    не записывается: строки только резервируют id и ключи в множествах,
+    чтобы проверка дочерних файлов видела их как существующие.
+    Для каждой записанной строки сохраняется хеш её значений.
+    С upsert строка с уже существующим id обновляется, если её хеш
+    изменился, и пропускается без проверок, если нет; объекты,
+    строки которых пропали из выгрузки, удаляются после загрузки всех
+    файлов, в обратном порядке. Рейтинги и счётчики пересчитываются
+    только для затронутых произведений и отзывов, поэтому время
+    загрузки почти неизменившейся выгрузки определяется чтением файлов.
+    Удаление опирается на полный список id файла, поэтому upsert
+    не совмещается с checkpoint.
+    report(table, rows, errors, seconds) вызывается после каждого файла,
+    error(table, line, message) — для каждой пропущенной строки,
+    progress(table, rows, seconds, done_bytes, total_bytes, eta) —
+    после каждой порции.
+    """
+
+    def __init__(self, source_dir=DATA_DIR, batch_size=1000, checkpoint=None,
+                 workers=0, validate_only=False, upsert=False, report=None,
+                 error=None, progress=None):
+        if upsert and checkpoint:
+            raise ValueError('Upsert cannot be resumed from a checkpoint')
+        self.source_dir = source_dir
+        self.batch_size = batch_size
+        self.checkpoint = None if validate_only else checkpoint
+        self.workers = workers
+        self.validate_only = validate_only
+        self.upsert = upsert
+        self.report = report or (lambda *args: None)
+        self.error = error or (lambda *args: None)
+        self.progress = progress or (lambda *args: None)
+        self.ids = {}
+        self.unique_keys = {}
+        self.object_keys = {}
+        self.fingerprints = {}
+        self.seen = defaultdict(set)
+        self.touched = defaultdict(set)
+        self.changes = defaultdict(Counter)
+
+    def load(self, tables=TABLES):
+        self.state = (
+            read_checkpoint(self.checkpoint) if self.checkpoint else {}
+        )
+        self.sizes = {
+            table.filename: os.path.getsize(self.get_path(table))
+            for table in tables
+        }
+        self.done_bytes = sum(
+            self.sizes[table.filename] if self.get_position(table)['done']
+            else self.get_position(table)['offset']
+            for table in tables
+        )
+        self.resumed_bytes = self.done_bytes
+        self.started = time.perf_counter()
+        self.executor = (
+            ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup
+            ) if self.workers else None
+        )
+        with self.executor or nullcontext(), keep_pub_dates(), (
+            nullcontext() if self.checkpoint or self.validate_only
+            else transaction.atomic()
+        ):
+            for table in tables:
+                self.load_table(table)
+            if self.validate_only:
+                return
+            with transaction.atomic(savepoint=False):
+                if not self.upsert:
+                    finish_import()
+                    return
+                for table in reversed(tables):
+                    self.delete_missing(table)
+                if any(self.changes.values()):
+                    finish_upsert(self.touched)
+
+    def get_path(self, table):
+        return os.path.join(self.source_dir, table.filename)
+
+    def get_position(self, table):
+        return self.state.get(
+            table.filename, {'offset': 0, 'line': 1, 'done': False}
+        )
+
+    def load_table(self, table):
+        started = time.perf_counter()
+        rows = errors = 0
+        position = self.get_position(table)
+        if position['done']:
+            self.report(table, rows, errors, 0)
+            return
+        if self.upsert:
+            self.get_fingerprints(table)
+        loaded_bytes = self.done_bytes - position['offset']
+        stream = CsvStream(
+            self.get_path(table), position['offset'], position['line']
+        )
+        for results, offset, line in self.parse_chunks(table, stream):
+            batch = []
+            for row_line, object_id, digest, values, error in results:
+                try:
+                    action = self.prepare(
+                        table, object_id, digest, values, error
+                    )
+                except ValueError as prepare_error:
+                    errors += 1
+                    self.error(table, row_line, prepare_error)
+                    continue
+                if action is not None:
+                    batch.append((action, values, digest))
+            rows += self.commit(table, batch)
+            self.save_position(table, offset, line)
+            self.done_bytes = loaded_bytes + offset
+            self.progress(
+                table, rows, time.perf_counter() - started,
+                self.done_bytes, sum(self.sizes.values()), self.estimate()
+            )
+        self.save_position(table, stream.offset, stream.line, done=True)
+        self.done_bytes = loaded_bytes + self.sizes[table.filename]
+        self.report(table, rows, errors, time.perf_counter() - started)
+
+    def read_chunks(self, stream):
+        """Порции строк файла с позицией после каждой порции."""
+        chunk = []
+        for line, row in stream:
+            chunk.append((line, row))
+            if len(chunk) >= self.batch_size:
+                yield chunk, stream.offset, stream.line
+                chunk = []
+        if chunk:
+            yield chunk, stream.offset, stream.line
+
+    def parse_chunks(self, table, stream):
+        """Разобранные порции в порядке чтения."""
+        if self.executor is None:
+            for chunk, offset, line in self.read_chunks(stream):
+                yield parse_rows(table, chunk), offset, line
+            return
+        pending = deque()
+        for chunk, offset, line in self.read_chunks(stream):
+            pending.append((
+                self.executor.submit(parse_chunk, table.filename, chunk),
+                offset, line
+            ))
+            if len(pending) > self.workers * 2:
+                future, offset, line = pending.popleft()
+                yield future.result(), offset, line
+        while pending:
+            future, offset, line = pending.popleft()
+            yield future.result(), offset, line
+
+    def prepare(self, table, object_id, digest, values, error):
+        """
+        Проверяет разобранную строку и возвращает, что с ней сделать:
+        ChangeLog.CREATED, ChangeLog.UPDATED или None, если строка
+        не изменилась с прошлой загрузки. Id строки с ошибкой тоже
+        отмечается как встреченный, чтобы upsert не удалил её объект.
+        """
+        if self.upsert and object_id is not None:
+            if object_id in self.seen[table.filename]:
+                raise ValueError(f'Duplicate id {object_id}')
+            self.seen[table.filename].add(object_id)
+        if error is not None:
+            raise ValueError(error)
+        exists = self.upsert and object_id in self.get_ids(table.model)
+        if exists and self.get_fingerprints(table).get(object_id) == digest:
+            return None
+        self.check(table, values, update=exists)
+        return ChangeLog.UPDATED if exists else ChangeLog.CREATED
+
+    def commit(self, table, batch):
+        if self.validate_only:
+            return len(batch)
+        with transaction.atomic(savepoint=False):
+            return self.write(table, batch)
+
+    def save_position(self, table, offset, line, done=False):
+        """Записывает позицию после зафиксированной порции."""
+        if self.checkpoint:
+            self.state[table.filename] = {
+                'offset': offset, 'line': line, 'done': done
+            }
+            write_json(self.checkpoint, self.state)
+
+    def estimate(self):
+        """Оставшееся время в секундах по скорости чтения байтов."""
+        loaded = self.done_bytes - self.resumed_bytes
+        if not loaded:
+            return None
+        speed = loaded / (time.perf_counter() - self.started)
+        return (sum(self.sizes.values()) - self.done_bytes) / speed
+
+    def get_ids(self, model):
+        if model not in self.ids:
+            self.ids[model] = set(
+                model._default_manager.values_list('id', flat=True)
+            )
+        return self.ids[model]
+
+    def get_unique_keys(self, table, fields):
+        """
+        Значения уникальных полей с id объекта, которому они заняты.
+        Обратное отображение id в значения хранится в object_keys.
+        """
+        if (table.model, fields) not in self.unique_keys:
+            self.object_keys[table.model, fields] = {
+                object_id: tuple(key) for object_id, *key in
+                table.model._default_manager.values_list('id', *fields)
+            }
+            self.unique_keys[table.model, fields] = {
+                key: object_id for object_id, key in
+                self.object_keys[table.model, fields].items()
+            }
+        return self.unique_keys[table.model, fields]
+
+    def get_fingerprints(self, table):
+        """
+        Хеши строк файла по id объектов. Хеши объектов, которых уже нет
+        в базе, например удалённых через API или каскадом, отбрасываются:
+        такие строки загружаются заново как новые.
+        """
+        if table.filename not in self.fingerprints:
+            fingerprints = dict(
+                ImportFingerprint.objects.filter(
+                    table=table.filename
+                ).values_list('object_id', 'digest')
+            )
+            ids = self.get_ids(table.model)
+            missing = [
+                object_id for object_id in fingerprints
+                if object_id not in ids
+            ]
+            for object_id in missing:
+                del fingerprints[object_id]
+            if missing and not self.validate_only:
+                self.delete_fingerprints(table, missing)
+            self.fingerprints[table.filename] = fingerprints
+        return self.fingerprints[table.filename]
+
+    def delete_fingerprints(self, table, object_ids):
+        for start in range(0, len(object_ids), self.batch_size):
+            ImportFingerprint.objects.filter(
+                table=table.filename,
+                object_id__in=object_ids[start:start + self.batch_size]
+            ).delete()
+
+    def check(self, table, values, update=False):
+        """
+        Проверяет строку по множествам id и ключей уникальности
+        и сразу резервирует её значения, чтобы дубли внутри файла
+        тоже отсеивались. При обновлении id и ключи самого объекта
+        конфликтом не считаются, а прежние ключи освобождаются для
+        следующих строк.
+        """
+        if not update and values['id'] in self.get_ids(table.model):
+            raise ValueError(f'Id {values["id"]} already exists')
+        for field, parent in table.parents.items():
+            if values[field] is not None and (
+                values[field] not in self.get_ids(parent)
+            ):
+                raise ValueError(
+                    f'{parent.__name__} {values[field]} does not exist'
+                )
+        keys = [
+            (fields, tuple(values[field] for field in fields))
+            for fields in table.unique
+        ]
+        for fields, key in keys:
+            if self.get_unique_keys(table, fields).get(
+                key, values['id']
+            ) != values['id']:
+                raise ValueError(f'Duplicate {", ".join(fields)}: {key}')
+        for fields, key in keys:
+            owners = self.unique_keys[table.model, fields]
+            object_keys = self.object_keys[table.model, fields]
+            previous = object_keys.get(values['id'])
+            if previous != key and owners.get(previous) == values['id']:
+                del owners[previous]
+            owners[key] = values['id']
+            object_keys[values['id']] = key
+        self.ids[table.model].add(values['id'])
+
+    def update(self, table, updated):
+        """
+        Обновляет строки одним bulk_update. SQLite проверяет
+        уникальность после каждой строки UPDATE, поэтому если строка
+        заняла ключ, который освобождает строка с большим id, строки
+        обновляются по одной в порядке файла.
+        """
+        manager = table.model._default_manager
+        if hasattr(table.model, 'updated_at'):
+            now = timezone.now()
+            updated = [dict(values, updated_at=now) for values in updated]
+        try:
+            with transaction.atomic():
+                manager.bulk_update(
+                    [table.model(**values) for values in updated],
+                    [field for field in updated[0] if field != 'id']
+                )
+        except IntegrityError:
+            for values in updated:
+                manager.filter(id=values['id']).update(**{
+                    field: value for field, value in values.items()
+                    if field != 'id'
+                })
+
+    def write(self, table, batch):
+        """
+        Обновляет и вставляет строки порции и сохраняет их хеши.
+        Обновления идут первыми, чтобы освобождённые ими ключи
+        уникальности можно было занять новыми строками.
+        В журнал изменений записи попадают явно: bulk_create
+        и bulk_update не отправляют сигналов.
+        """
+        if not batch:
+            return 0
+        rows = {ChangeLog.CREATED: [], ChangeLog.UPDATED: []}
+        for action, values, _ in batch:
+            rows[action].append(values)
+        created, updated = rows[ChangeLog.CREATED], rows[ChangeLog.UPDATED]
+        manager = table.model._default_manager
+        if self.upsert:
+            self.touch(table, [values['id'] for values in updated])
+            self.touch(table, values=created + updated)
+        if updated:
+            self.update(table, updated)
+        if created:
+            manager.bulk_create(table.model(**values) for values in created)
+        ImportFingerprint.objects.filter(
+            table=table.filename,
+            object_id__in=[values['id'] for _, values, _ in batch]
+        ).delete()
+        ImportFingerprint.objects.bulk_create(
+            ImportFingerprint(
+                table=table.filename, object_id=values['id'], digest=digest
+            )
+            for _, values, digest in batch
+        )
+        for action, values in rows.items():
+            if values and table.model in LOGGED_MODELS:
+                record_changes(
+                    table.model, [row['id'] for row in values], action
+                )
+            self.changes[table.filename][action] += len(values)
+        return len(batch)
+
+    def delete_missing(self, table):
+        """Удаляет объекты, строки которых пропали из выгрузки."""
+        missing = sorted(
+            self.get_fingerprints(table).keys() - self.seen[table.filename]
+        )
+        for start in range(0, len(missing), self.batch_size):
+            object_ids = missing[start:start + self.batch_size]
+            self.touch(table, object_ids)
+            table.model._default_manager.filter(id__in=object_ids).delete()
+            ImportFingerprint.objects.filter(
+                table=table.filename, object_id__in=object_ids
+            ).delete()
+        self.changes[table.filename][ChangeLog.DELETED] += len(missing)
+
+    def touch(self, table, object_ids=(), values=()):
+        """
+        Запоминает родителей, чьи счётчики нужно пересчитать: по новым
+        значениям строк и по текущим значениям объектов в базе.
+        """
+        if table.model not in AGGREGATED_PARENTS:
+            return
+        parent, field = AGGREGATED_PARENTS[table.model]
+        self.touched[parent].update(row[field] for row in values)
+        if object_ids:
+            self.touched[parent].update(
+                table.model._default_manager.filter(
+                    id__in=object_ids
+                ).values_list(field, flat=True)
+            )
@@ -0,0 +1,166 @@
+import csv
+import os
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+
+from reviews.dataset import BulkLoader
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+CATEGORIES = 10
+GENRES = 10
+GENRES_PER_TITLE = 2
+PUB_DATE = '2019-09-24T21:08:21.567Z'
+
+
+def write_rows(directory, filename, header, rows):
+    with open(os.path.join(directory, filename), 'w', encoding='utf-8',
+              newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def generate_dataset(directory, users, titles, reviews_per_title,
+                     comments_per_review, start=1):
+    """
+    Записывает в directory выгрузку в формате static/data и возвращает
+    количество строк в ней. Id всех таблиц начинаются со start, чтобы
+    не пересекаться с данными в базе.
+    """
+    user_ids = range(start, start + users)
+    title_ids = range(start, start + titles)
+    write_rows(directory, 'users.csv', (
+        'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'
+    ), (
+        (id, f'bench{id}', f'bench{id}@yamdb.fake', 'user', '', '', '')
+        for id in user_ids
+    ))
+    for filename, count in (('category.csv', CATEGORIES),
+                            ('genre.csv', GENRES)):
+        write_rows(directory, filename, ('id', 'name', 'slug'), (
+            (id, f'Раздел {id}', f'bench-{id}')
+            for id in range(start, start + count)
+        ))
+    write_rows(directory, 'titles.csv', ('id', 'name', 'year', 'category'), (
+        (id, f'Произведение {id}', 1900 + id % 120, start + id % CATEGORIES)
+        for id in title_ids
+    ))
+    write_rows(directory, 'genre_title.csv', ('id', 'title_id', 'genre_id'), (
+        (start + index * GENRES_PER_TITLE + offset, id,
+         start + (id + offset) % GENRES)
+        for index, id in enumerate(title_ids)
+        for offset in range(GENRES_PER_TITLE)
+    ))
+    write_rows(directory, 'review.csv', (
+        'id', 'title_id', 'text', 'author', 'score', 'pub_date'
+    ), (
+        (start + index * reviews_per_title + offset, id, f'Отзыв на {id}',
+         user_ids[(index + offset) % users], 1 + (index + offset) % 10,
+         PUB_DATE)
+        for index, id in enumerate(title_ids)
+        for offset in range(reviews_per_title)
+    ))
+    reviews = titles * reviews_per_title
+    write_rows(directory, 'comments.csv', (
+        'id', 'review_id', 'text', 'author', 'pub_date'
+    ), (
+        (start + index * comments_per_review + offset, start + index,
+         'Комментарий', user_ids[(index + offset) % users], PUB_DATE)
+        for index in range(reviews)
+        for offset in range(comments_per_review)
+    ))
+    return (
+        users + CATEGORIES + GENRES + titles * (1 + GENRES_PER_TITLE)
+        + reviews * (1 + comments_per_review)
+    )
+
+
+class Command(BaseCommand):
+    """
+    Замер скорости import_data --bulk в зависимости от числа процессов
+    разбора. Выгрузка генерируется во временный каталог, каждый прогон
+    загружает её целиком в транзакции, которая затем откатывается,
+    поэтому данные в базе не меняются.
+    """
+
+    help = 'Сравнивает скорость загрузки выгрузки с разным числом процессов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users', type=int, default=20000,
+            help='Количество пользователей.',
+        )
+        parser.add_argument(
+            '--titles', type=int, default=100000,
+            help='Количество произведений.',
+        )
+        parser.add_argument(
+            '--reviews-per-title', type=int, default=10,
+            help='Количество отзывов на произведение.',
+        )
+        parser.add_argument(
+            '--comments-per-review', type=int, default=1,
+            help='Количество комментариев к отзыву.',
+        )
+        parser.add_argument(
+            '--workers', type=int, action='append',
+            help=(
+                'Количество процессов разбора, можно указать несколько '
+                'раз. По умолчанию 0, 1, 2 и 4.'
+            ),
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество строк в одной порции.',
+        )
+
+    def handle(self, *args, **options):
+        if not 0 < options['reviews_per_title'] <= options['users']:
+            raise CommandError(
+                'Reviews per title must be between 1 and the number of users'
+            )
+        start = 1 + max(
+            model.objects.aggregate(id=Max('id'))['id'] or 0
+            for model in (
+                User, Category, Genre, Title, Title.genre.through, Review,
+                Comment
+            )
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            started = time.perf_counter()
+            rows = generate_dataset(
+                directory, options['users'], options['titles'],
+                options['reviews_per_title'], options['comments_per_review'],
+                start
+            )
+            self.stdout.write(
+                'Generated %s rows in %.2fs' % (
+                    rows, time.perf_counter() - started
+                )
+            )
+            self.stdout.write(
+                f'{"workers":>7} {"seconds":>9} {"rows/s":>10} '
+                f'{"speedup":>8}'
+            )
+            baseline = None
+            for workers in options['workers'] or (0, 1, 2, 4):
+                seconds = self.run(directory, workers, options['batch_size'])
+                baseline = baseline or seconds
+                self.stdout.write(
+                    f'{workers:>7} {seconds:>9.2f} {rows / seconds:>10.0f} '
+                    f'{baseline / seconds:>8.2f}'
+                )
+
+    def run(self, directory, workers, batch_size):
+        started = time.perf_counter()
+        with transaction.atomic():
+            BulkLoader(
+                source_dir=directory, batch_size=batch_size, workers=workers
+            ).load()
+            seconds = time.perf_counter() - started
+            transaction.set_rollback(True)
+        return seconds
@@ -0,0 +1,48 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.dataset import TABLES, export_table
+
+
+class Command(BaseCommand):
+    """
+    Выгрузка базы в csv файлы в том же формате, который читает
+    import_data. Все файлы пишутся в одной транзакции, поэтому
+    выгрузка согласована между таблицами.
+    """
+
+    help = 'Выгружает данные в csv файлы в формате static/data.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target-dir',
+            required=True,
+            help='Каталог для csv файлов.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=settings.EXPORT_CHUNK_SIZE,
+            help='Количество строк, читаемых из базы за один раз.',
+        )
+
+    def handle(self, *args, **options):
+        os.makedirs(options['target_dir'], exist_ok=True)
+        with transaction.atomic():
+            for table in TABLES:
+                started = time.perf_counter()
+                rows = export_table(
+                    table, options['target_dir'], options['chunk_size']
+                )
+                seconds = time.perf_counter() - started
+                self.stdout.write(self.style.SUCCESS(
+                    'Exported %s rows to %s in %.2fs (%.0f rows/s)' % (
+                        rows, table, seconds,
+                        rows / seconds if seconds else 0
+                    )
+                ))
+        self.stdout.write(self.style.SUCCESS('Exported all data'))
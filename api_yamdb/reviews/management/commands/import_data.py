@@ -1,8 +1,11 @@
 import csv
 import os
+import time
+from datetime import timedelta
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
+from reviews.dataset import DATA_DIR, BulkLoader, write_json
 from reviews.models import Category, Comment, Genre, Review, Title, User
 
 
@@ -11,18 +14,166 @@ class Command(BaseCommand):
     Класс для импорта данных из csv файлов в базу данных.
     """
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Загрузить данные через bulk_create одной транзакцией.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество строк в одном INSERT в режиме --bulk.',
+        )
+        parser.add_argument(
+            '--source-dir',
+            default=DATA_DIR,
+            help='Каталог с csv файлами, по умолчанию static/data.',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help=(
+                'Файл контрольной точки: каждая порция фиксируется '
+                'отдельно, повторный запуск продолжает загрузку '
+                'с места остановки. Включает режим --bulk.'
+            ),
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=0,
+            help=(
+                'Количество процессов для разбора строк. Вставку '
+                'выполняет основной процесс. Включает режим --bulk.'
+            ),
+        )
+        parser.add_argument(
+            '--validate-only',
+            action='store_true',
+            help=(
+                'Только проверить файлы теми же проверками, что и при '
+                'загрузке, ничего не записывая в базу.'
+            ),
+        )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help=(
+                'Загрузить только изменения: новые строки вставить, '
+                'изменившиеся обновить, пропавшие из выгрузки удалить. '
+                'Включает режим --bulk.'
+            ),
+        )
+        parser.add_argument(
+            '--report',
+            help=(
+                'JSON-файл для отчёта об ошибках в режимах --bulk '
+                'и --validate-only. Ошибки тогда не выводятся построчно.'
+            ),
+        )
+
     def handle(self, *args, **options):
+        if options['upsert'] and options['checkpoint']:
+            raise CommandError('--upsert cannot be used with --checkpoint')
+        if any(options[name] for name in (
+            'bulk', 'checkpoint', 'workers', 'validate_only', 'upsert'
+        )):
+            self.load_bulk(options)
+            return
 
-        self.load_data()
+        self.load_data(options['source_dir'])
 
-    def load_data(self):
+    def load_bulk(self, options):
         """
-        Считывает данные из csv файлов и сохраняет их в базу данных.
+        Загружает или только проверяет данные порциями и выводит
+        скорость обработки каждого файла и ход загрузки.
         """
-        root_dir = os.path.dirname(os.path.dirname(
-            os.path.dirname(os.path.dirname(__file__))))
-        data_dir = os.path.join(root_dir, 'static', 'data')
+        self.progress_shown = 0
+        self.report = {
+            'source_dir': str(options['source_dir']),
+            'validate_only': options['validate_only'],
+            'files': {},
+            'errors': [],
+        }
+        self.print_errors = not options['report']
+        loader = BulkLoader(
+            source_dir=options['source_dir'],
+            batch_size=options['batch_size'],
+            checkpoint=options['checkpoint'],
+            workers=options['workers'],
+            validate_only=options['validate_only'],
+            upsert=options['upsert'],
+            report=self.report_table,
+            error=self.report_error,
+            progress=self.report_progress,
+        )
+        loader.load()
+        if options['upsert'] and not options['validate_only']:
+            self.report_changes(loader.changes)
+        if options['report']:
+            write_json(options['report'], self.report)
+        errors = len(self.report['errors'])
+        if not options['validate_only']:
+            self.stdout.write(self.style.SUCCESS('Imported all data'))
+        elif errors:
+            raise CommandError(
+                f'Found {errors} errors in {options["source_dir"]}'
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS('Validated all data'))
+
+    def report_progress(self, table, rows, seconds, done_bytes, total_bytes,
+                        eta):
+        """Выводит ход загрузки не чаще раза в секунду."""
+        now = time.monotonic()
+        if now - self.progress_shown < 1:
+            return
+        self.progress_shown = now
+        self.stdout.write(
+            '%s: %.1f%% done, %s rows at %.0f rows/s, ETA %s' % (
+                table, done_bytes * 100 / total_bytes, rows,
+                rows / seconds if seconds else 0,
+                'unknown' if eta is None else timedelta(seconds=int(eta))
+            ),
+            ending='\r' if self.stdout.isatty() else '\n'
+        )
+
+    def report_changes(self, changes):
+        self.report['changes'] = changes
+        for filename, counts in changes.items():
+            self.stdout.write(self.style.SUCCESS(
+                'Upserted %s: %s created, %s updated, %s deleted' % (
+                    filename, counts['created'], counts['updated'],
+                    counts['deleted']
+                )
+            ))
+
+    def report_table(self, table, rows, errors, seconds):
+        self.report['files'][str(table)] = {
+            'rows': rows, 'errors': errors, 'seconds': round(seconds, 3),
+        }
+        self.stdout.write(self.style.SUCCESS(
+            '%s %s rows from %s in %.2fs (%.0f rows/s), %s errors' % (
+                'Validated' if self.report['validate_only'] else 'Imported',
+                rows, table, seconds, rows / seconds if seconds else 0,
+                errors
+            )
+        ))
+
+    def report_error(self, table, line, error):
+        self.report['errors'].append({
+            'file': str(table), 'line': line, 'message': str(error),
+        })
+        if self.print_errors:
+            self.stdout.write(self.style.ERROR(
+                'Error in %s, line %s: %s' % (table, line, error)
+            ))
 
+    def load_data(self, data_dir):
+        """
+        Считывает данные из csv файлов и сохраняет их в базу данных.
+        """
         models = {
             'users.csv': User,
             'category.csv': Category,
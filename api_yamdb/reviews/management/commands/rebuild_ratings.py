@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews.services import (find_inconsistent_histograms,
+                              find_inconsistent_titles, rebuild_title_scores)
+
+
+class Command(BaseCommand):
+    """
+    Пересчитывает сохранённые счётчики и гистограммы оценок произведений
+    и проверяет их согласованность с таблицей отзывов.
+    """
+
+    help = 'Пересчитывает рейтинги произведений по отзывам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить счётчики, ничего не изменяя.',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            titles = find_inconsistent_titles()
+            for title in titles:
+                self.stdout.write(self.style.ERROR(
+                    'Title %s: stored %s/%s, actual %s/%s' % (
+                        title.id, title.score_sum, title.review_count,
+                        title.actual_sum, title.actual_count
+                    )
+                ))
+            histograms = find_inconsistent_histograms()
+            for title_id in histograms:
+                self.stdout.write(self.style.ERROR(
+                    'Title %s: inconsistent score histogram' % title_id
+                ))
+            if titles or histograms:
+                raise CommandError(
+                    'Found %s titles with inconsistent ratings' % len(
+                        {title.id for title in titles} | set(histograms)
+                    )
+                )
+            self.stdout.write(self.style.SUCCESS('All ratings are consistent'))
+            return
+
+        with transaction.atomic():
+            titles = rebuild_title_scores()
+        self.stdout.write(
+            self.style.SUCCESS('Rebuilt ratings of %s titles' % len(titles))
+        )
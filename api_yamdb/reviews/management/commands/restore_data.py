@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+from reviews.snapshots import restore_snapshot
+
+
+class Command(BaseCommand):
+    """
+    Восстановление базы данных из снимка, сделанного snapshot_data.
+    Все текущие данные заменяются данными снимка. Кеш очищается, но
+    запущенные серверы с локальным кешем в памяти нужно перезапустить.
+    """
+
+    help = 'Восстанавливает базу данных из снимка.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл снимка.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            restore_snapshot(options['path'])
+        except ValueError as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(
+            'Restored snapshot from %s in %.2fs' % (
+                options['path'], time.perf_counter() - started
+            )
+        ))
+        executor = MigrationExecutor(connection)
+        plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+        if plan:
+            self.stdout.write(self.style.WARNING(
+                'Snapshot has %s unapplied migrations, run migrate' % len(
+                    plan
+                )
+            ))
@@ -0,0 +1,30 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.snapshots import save_snapshot
+
+
+class Command(BaseCommand):
+    """
+    Снимок базы данных для быстрого восстановления через restore_data.
+    """
+
+    help = 'Сохраняет снимок базы данных в файл.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл снимка.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            save_snapshot(options['path'])
+        except ValueError as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(
+            'Saved snapshot to %s (%.1f MB) in %.2fs' % (
+                options['path'], os.path.getsize(options['path']) / 2 ** 20,
+                time.perf_counter() - started
+            )
+        ))
@@ -0,0 +1,36 @@
+# Generated by Django 3.2 on 2026-10-18 17:22
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_score_totals(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    titles = Title.objects.annotate(
+        actual_sum=Sum('reviews__score'), actual_count=Count('reviews')
+    ).filter(actual_count__gt=0)
+    for title in titles:
+        title.score_sum = title.actual_sum
+        title.review_count = title.actual_count
+        title.save(update_fields=['score_sum', 'review_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_auto_20240925_1414'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество отзывов'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_score_totals, migrations.RunPython.noop),
+    ]
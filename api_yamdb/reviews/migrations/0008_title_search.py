@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from reviews.search import install_title_search, uninstall_title_search
+
+
+def install(apps, schema_editor):
+    install_title_search(schema_editor.connection)
+
+
+def uninstall(apps, schema_editor):
+    uninstall_title_search(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_year_name_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 3.2 on 2026-10-18 17:35
+
+from django.db import migrations, models
+
+
+def fill_name_casefold(apps, schema_editor):
+    for model_name in ('Category', 'Genre', 'Title'):
+        model = apps.get_model('reviews', model_name)
+        objects = list(model.objects.only('id', 'name'))
+        for obj in objects:
+            obj.name_casefold = obj.name.casefold()
+        model.objects.bulk_update(objects, ['name_casefold'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='name_casefold',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=768),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='name_casefold',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=768),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='name_casefold',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=768),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_name_casefold, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.2 on 2026-10-18 18:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0013_change_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(max_length=30, verbose_name='Файл выгрузки')),
+                ('object_id', models.PositiveIntegerField(verbose_name='Id объекта')),
+                ('digest', models.BigIntegerField(verbose_name='Хеш строки')),
+            ],
+            options={
+                'verbose_name': 'Хеш строки выгрузки',
+                'verbose_name_plural': 'Хеши строк выгрузки',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='importfingerprint',
+            constraint=models.UniqueConstraint(fields=('table', 'object_id'), name='unique_import_fingerprint'),
+        ),
+    ]
@@ -2,13 +2,35 @@ from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
-from reviews.constants import MAX_NAME_LENGTH, MAX_SLUG_LENGTH
+from reviews.constants import (MAX_NAME_LENGTH, MAX_SCORE, MAX_SLUG_LENGTH,
+                               MIN_SCORE, SCORE_RANGE)
 from reviews.validators import validate_year
 
 User = get_user_model()
 
 
-class Category(models.Model):
+class NameCasefoldModel(models.Model):
+    """
+    Хранит casefold-копию названия с индексом для поиска без учёта
+    регистра: SQLite сам сворачивает регистр только для ASCII.
+    """
+
+    name_casefold = models.CharField(
+        max_length=MAX_NAME_LENGTH * 3, db_index=True, editable=False
+    )
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        self.name_casefold = self.name.casefold()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'name_casefold'}
+        super().save(*args, **kwargs)
+
+
+class Category(NameCasefoldModel):
     name = models.CharField('Название', max_length=MAX_NAME_LENGTH)
     slug = models.SlugField('Слаг', unique=True, max_length=MAX_SLUG_LENGTH)
 
@@ -18,7 +40,7 @@ class Category(models.Model):
         ordering = ('name',)
 
 
-class Genre(models.Model):
+class Genre(NameCasefoldModel):
     name = models.CharField('Название', max_length=MAX_NAME_LENGTH)
     slug = models.SlugField('Слаг', unique=True, max_length=MAX_SLUG_LENGTH)
 
@@ -28,7 +50,7 @@ class Genre(models.Model):
         ordering = ('name', 'slug')
 
 
-class Title(models.Model):
+class Title(NameCasefoldModel):
     name = models.CharField('Название', max_length=MAX_NAME_LENGTH)
     year = models.IntegerField(
         'Год создания',
@@ -42,9 +64,32 @@ class Title(models.Model):
         null=True,
         blank=True
     )
+    score_sum = models.PositiveIntegerField(
+        'Сумма оценок', default=0, editable=False
+    )
+    review_count = models.PositiveIntegerField(
+        'Количество отзывов', default=0, editable=False
+    )
+    rating = models.FloatField(
+        'Рейтинг', null=True, blank=True, editable=False
+    )
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
 
     class Meta:
         default_related_name = 'titles'
+        indexes = [
+            models.Index(
+                fields=('year', 'name', 'id'), name='title_year_name_id_idx'
+            ),
+            models.Index(fields=('name', 'id'), name='title_name_id_idx'),
+            models.Index(
+                fields=('rating', 'id'), name='title_rating_id_idx'
+            ),
+            models.Index(
+                fields=('review_count', 'id'),
+                name='title_review_count_id_idx'
+            ),
+        ]
         ordering = ('year', 'name')
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
@@ -52,6 +97,13 @@ class Title(models.Model):
     def __str__(self):
         return self.name
 
+    def get_rating_histogram(self):
+        """Распределение оценок произведения по всему диапазону."""
+        histogram = dict.fromkeys(SCORE_RANGE, 0)
+        for score_count in self.score_counts.all():
+            histogram[score_count.score] = score_count.count
+        return histogram
+
 
 class Review(models.Model):
     """
@@ -69,11 +121,18 @@ class Review(models.Model):
         verbose_name='Автор отзыва'
     )
     score = models.PositiveSmallIntegerField(
-        validators=[MinValueValidator(1), MaxValueValidator(10)],
+        validators=[
+            MinValueValidator(MIN_SCORE), MaxValueValidator(MAX_SCORE)
+        ],
         verbose_name='Оценка'
     )
     pub_date = models.DateTimeField(auto_now_add=True,
                                     verbose_name='Дата публикации')
+    updated_at = models.DateTimeField(auto_now=True,
+                                      verbose_name='Дата изменения')
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев', default=0, editable=False
+    )
 
     class Meta:
         constraints = [
@@ -81,13 +140,60 @@ class Review(models.Model):
                 fields=['title', 'author'], name='unique_review'
             )
         ]
-        ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=('title', '-pub_date', '-id'),
+                name='review_title_pub_date_idx'
+            ),
+        ]
+        ordering = ['-pub_date', '-id']
         verbose_name = 'Review'
         verbose_name_plural = 'Reviews'
 
     def __str__(self):
         return self.text[:50]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает загруженные из базы значения для пересчёта рейтинга."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+
+class ScoreCount(models.Model):
+    """
+    Счётчик отзывов с определённой оценкой на произведение.
+    Строки модели образуют гистограмму оценок произведения.
+    """
+
+    title = models.ForeignKey(
+        Title, on_delete=models.CASCADE, related_name='score_counts',
+        verbose_name='Произведение'
+    )
+    score = models.PositiveSmallIntegerField(
+        validators=[
+            MinValueValidator(MIN_SCORE), MaxValueValidator(MAX_SCORE)
+        ],
+        verbose_name='Оценка'
+    )
+    count = models.PositiveIntegerField(
+        default=0, verbose_name='Количество отзывов'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'score'], name='unique_score_count'
+            )
+        ]
+        ordering = ('title', 'score')
+        verbose_name = 'Счётчик оценок'
+        verbose_name_plural = 'Счётчики оценок'
+
+    def __str__(self):
+        return f'{self.title_id}: {self.score} x {self.count}'
+
 
 class Comment(models.Model):
     """
@@ -105,11 +211,81 @@ class Comment(models.Model):
     )
     pub_date = models.DateTimeField(auto_now_add=True,
                                     verbose_name='Дата публикации')
+    updated_at = models.DateTimeField(auto_now=True,
+                                      verbose_name='Дата изменения')
 
     class Meta:
-        ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=('review', '-pub_date', '-id'),
+                name='comment_review_pub_date_idx'
+            ),
+        ]
+        ordering = ['-pub_date', '-id']
         verbose_name = 'Comment'
         verbose_name_plural = 'Comments'
 
     def __str__(self):
         return self.text[:50]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает загруженный отзыв для пересчёта комментариев."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+
+class ChangeLog(models.Model):
+    """
+    Журнал изменений произведений, отзывов и комментариев.
+    Возрастающий id служит курсором ленты изменений, записи об удалении
+    остаются в журнале как надгробия.
+    """
+
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    ACTIONS = (
+        (CREATED, 'Создание'),
+        (UPDATED, 'Изменение'),
+        (DELETED, 'Удаление'),
+    )
+
+    model = models.CharField('Модель', max_length=20)
+    object_id = models.PositiveIntegerField('Id объекта')
+    action = models.CharField('Действие', max_length=7, choices=ACTIONS)
+    changed_at = models.DateTimeField('Дата изменения', auto_now_add=True)
+
+    class Meta:
+        ordering = ('id',)
+        verbose_name = 'Изменение'
+        verbose_name_plural = 'Журнал изменений'
+
+    def __str__(self):
+        return f'{self.id}: {self.action} {self.model} {self.object_id}'
+
+
+class ImportFingerprint(models.Model):
+    """
+    Хеш строки выгрузки, из которой загружен объект. По хешам
+    повторная загрузка в режиме upsert пропускает неизменившиеся строки
+    и находит объекты, удалённые из выгрузки.
+    """
+
+    table = models.CharField('Файл выгрузки', max_length=30)
+    object_id = models.PositiveIntegerField('Id объекта')
+    digest = models.BigIntegerField('Хеш строки')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['table', 'object_id'],
+                name='unique_import_fingerprint'
+            )
+        ]
+        verbose_name = 'Хеш строки выгрузки'
+        verbose_name_plural = 'Хеши строк выгрузки'
+
+    def __str__(self):
+        return f'{self.table} {self.object_id}'
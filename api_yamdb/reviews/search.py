@@ -0,0 +1,106 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'reviews_title_fts'
+
+# FTS5 с токенизатором unicode61 приводит к нижнему регистру любые буквы,
+# включая кириллицу, но не считает «ё» и «е» одной буквой, поэтому
+# «ё» заменяется и в индексе, и в поисковом запросе.
+SQL_NORMALIZE = "replace(replace({}, 'ё', 'е'), 'Ё', 'Е')"
+
+CREATE_TABLE = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+    "name, description, tokenize='unicode61 remove_diacritics 2')"
+)
+FILL_TABLE = (
+    f'INSERT INTO {FTS_TABLE}(rowid, name, description) '
+    'SELECT id, {name}, {description} FROM reviews_title'
+).format(
+    name=SQL_NORMALIZE.format('name'),
+    description=SQL_NORMALIZE.format('description'),
+)
+INSERT_ROW = (
+    f'INSERT INTO {FTS_TABLE}(rowid, name, description) '
+    'VALUES (new.id, {name}, {description});'
+).format(
+    name=SQL_NORMALIZE.format('new.name'),
+    description=SQL_NORMALIZE.format('new.description'),
+)
+DELETE_ROW = f'DELETE FROM {FTS_TABLE} WHERE rowid = old.id;'
+TRIGGERS = {
+    f'{FTS_TABLE}_insert': f'AFTER INSERT ON reviews_title BEGIN {INSERT_ROW}',
+    f'{FTS_TABLE}_delete': f'AFTER DELETE ON reviews_title BEGIN {DELETE_ROW}',
+    f'{FTS_TABLE}_update': (
+        'AFTER UPDATE OF id, name, description ON reviews_title '
+        f'BEGIN {DELETE_ROW} {INSERT_ROW}'
+    ),
+}
+
+
+def install_title_search(connection, create=True):
+    """
+    Создаёт полнотекстовый индекс произведений и триггеры синхронизации.
+    Операция идемпотентна: SQLite удаляет триггеры при пересоздании
+    таблицы в миграциях, поэтому недостающие триггеры создаются заново,
+    а индекс перестраивается. С create=False индекс только
+    восстанавливается, если он уже был создан миграцией.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            'AND tbl_name = %s', ['reviews_title']
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if existing >= TRIGGERS.keys():
+            return
+        tables = connection.introspection.table_names(cursor)
+        if not create and FTS_TABLE not in tables:
+            return
+        cursor.execute(CREATE_TABLE)
+        for name, body in TRIGGERS.items():
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            cursor.execute(f'CREATE TRIGGER {name} {body} END')
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(FILL_TABLE)
+
+
+def uninstall_title_search(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name in TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def build_match_query(text):
+    """Запрос FTS5: все слова обязательны, каждое ищется как префикс."""
+    words = re.findall(r'\w+', text.replace('ё', 'е').replace('Ё', 'Е'))
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_titles(queryset, text):
+    """
+    Отбирает произведения по словам из названия и описания
+    и сортирует их по релевантности (bm25).
+    """
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+    if connection.vendor != 'sqlite':
+        for word in re.findall(r'\w+', text):
+            queryset = queryset.filter(
+                Q(name__icontains=word) | Q(description__icontains=word)
+            )
+        return queryset
+    return queryset.filter(id__in=RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match]
+    )).annotate(search_rank=RawSQL(
+        f'SELECT bm25({FTS_TABLE}) FROM {FTS_TABLE} '
+        f'WHERE {FTS_TABLE} MATCH %s AND rowid = reviews_title.id', [match]
+    )).order_by('search_rank', 'id')
@@ -0,0 +1,280 @@
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.utils import timezone
+
+from reviews.constants import TOP_TITLES_SIZE
+from reviews.models import ChangeLog, Comment, Review, ScoreCount, Title
+from reviews.versioning import CATALOG, bump_version, get_version
+
+TOP_ORDERING = ('-rating', '-review_count', 'id')
+
+
+def get_rating(score_sum, review_count):
+    """Средняя оценка по счётчикам, None для произведения без отзывов."""
+    if not review_count:
+        return None
+    return score_sum / review_count
+
+
+def record_changes(model, object_ids, action):
+    """Записывает изменения объектов модели в журнал для ленты изменений."""
+    ChangeLog.objects.bulk_create(
+        ChangeLog(
+            model=model._meta.model_name, object_id=object_id, action=action
+        )
+        for object_id in object_ids
+    )
+
+
+def update_title_scores(title_id, added=(), removed=()):
+    """
+    Применяет к счётчикам произведения добавленные и удалённые оценки.
+    Обновление выполняется одним UPDATE без чтения строки произведения:
+    все выражения SET видят старые значения столбцов, поэтому рейтинг
+    считается из тех же сдвинутых сумм. Затем корректируются строки
+    гистограммы оценок. Рейтинг входит в данные произведения,
+    поэтому его изменение попадает в журнал изменений.
+    """
+    added, removed = list(added), list(removed)
+    if not added and not removed:
+        return
+    score_sum = F('score_sum') + sum(added) - sum(removed)
+    review_count = F('review_count') + len(added) - len(removed)
+    if Title.objects.filter(id=title_id).update(
+        score_sum=score_sum,
+        review_count=review_count,
+        rating=Cast(score_sum, FloatField()) / NullIf(review_count, 0),
+        updated_at=timezone.now(),
+    ):
+        record_changes(Title, [title_id], ChangeLog.UPDATED)
+    deltas = Counter(added)
+    deltas.subtract(removed)
+    for score, delta in deltas.items():
+        if delta:
+            update_score_count(title_id, score, delta)
+
+
+def bulk_create_reviews(reviews, batch_size=500):
+    """
+    Сохраняет пачку новых отзывов в одной транзакции.
+    bulk_create не отправляет сигналы, поэтому счётчики оценок
+    обновляются здесь — по одному разу на произведение — и здесь же
+    увеличиваются версии кешей. Отзывам проставляются id: не все базы
+    возвращают их из массовой вставки, а пара (title, author) уникальна.
+    """
+    if not reviews:
+        return reviews
+    scores = defaultdict(list)
+    for review in reviews:
+        scores[review.title_id].append(review.score)
+    with transaction.atomic():
+        Review.objects.bulk_create(reviews, batch_size=batch_size)
+        ids = {
+            (title_id, author_id): review_id
+            for review_id, title_id, author_id in Review.objects.filter(
+                title_id__in=scores,
+                author_id__in={review.author_id for review in reviews},
+            ).values_list('id', 'title_id', 'author_id')
+        }
+        for review in reviews:
+            review.id = ids[review.title_id, review.author_id]
+        record_changes(
+            Review, [review.id for review in reviews], ChangeLog.CREATED
+        )
+        for title_id, added in scores.items():
+            update_title_scores(title_id, added=added)
+            bump_version('reviews', title_id)
+        bump_version(CATALOG)
+    return reviews
+
+
+def update_score_count(title_id, score, delta):
+    """Сдвигает счётчик гистограммы, создавая строку при первой оценке."""
+    score_counts = ScoreCount.objects.filter(title_id=title_id, score=score)
+    if score_counts.update(count=F('count') + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            ScoreCount.objects.create(
+                title_id=title_id, score=score, count=delta
+            )
+    except IntegrityError:
+        score_counts.update(count=F('count') + delta)
+
+
+def update_comment_count(review_id, delta):
+    """Сдвигает счётчик комментариев отзыва одним UPDATE."""
+    if Review.objects.filter(id=review_id).update(
+        comment_count=F('comment_count') + delta,
+        updated_at=timezone.now(),
+    ):
+        record_changes(Review, [review_id], ChangeLog.UPDATED)
+
+
+def refresh_comment_count(review_id):
+    """Пересчитывает счётчик комментариев отзыва по таблице комментариев."""
+    if Review.objects.filter(id=review_id).update(
+        comment_count=Comment.objects.filter(review_id=review_id).count(),
+        updated_at=timezone.now(),
+    ):
+        record_changes(Review, [review_id], ChangeLog.UPDATED)
+
+
+def get_actual_score_counts(title_ids=None):
+    """Фактическая гистограмма оценок по таблице отзывов."""
+    reviews = Review.objects.all()
+    if title_ids is not None:
+        reviews = reviews.filter(title_id__in=title_ids)
+    rows = reviews.order_by().values('title_id', 'score').annotate(
+        count=Count('id')
+    )
+    return {(row['title_id'], row['score']): row['count'] for row in rows}
+
+
+def get_stored_score_counts(title_ids=None):
+    """Сохранённая гистограмма оценок без пустых счётчиков."""
+    score_counts = ScoreCount.objects.filter(count__gt=0)
+    if title_ids is not None:
+        score_counts = score_counts.filter(title_id__in=title_ids)
+    return {
+        (title_id, score): count
+        for title_id, score, count in score_counts.values_list(
+            'title_id', 'score', 'count'
+        )
+    }
+
+
+def refresh_title_scores(title_id):
+    """Пересчитывает счётчики одного произведения по его отзывам."""
+    totals = Review.objects.filter(title_id=title_id).aggregate(
+        score_sum=Coalesce(Sum('score'), 0), review_count=Count('id')
+    )
+    if Title.objects.filter(id=title_id).update(
+        rating=get_rating(**totals), updated_at=timezone.now(), **totals
+    ):
+        record_changes(Title, [title_id], ChangeLog.UPDATED)
+    ScoreCount.objects.filter(title_id=title_id).delete()
+    ScoreCount.objects.bulk_create(
+        ScoreCount(title_id=title_id, score=score, count=count)
+        for (_, score), count in get_actual_score_counts([title_id]).items()
+    )
+
+
+def find_inconsistent_titles():
+    """
+    Возвращает произведения, у которых сохранённые счётчики
+    расходятся с фактическими отзывами.
+    Атрибуты actual_sum и actual_count содержат верные значения.
+    """
+    titles = Title.objects.annotate(
+        actual_sum=Coalesce(Sum('reviews__score'), 0),
+        actual_count=Count('reviews'),
+    ).order_by('id')
+    return [
+        title for title in titles
+        if (title.score_sum, title.review_count, title.rating) != (
+            title.actual_sum, title.actual_count,
+            get_rating(title.actual_sum, title.actual_count)
+        )
+    ]
+
+
+def find_inconsistent_histograms():
+    """Возвращает id произведений с неверной гистограммой оценок."""
+    actual = get_actual_score_counts()
+    stored = get_stored_score_counts()
+    return sorted({
+        title_id for title_id, score in actual.keys() | stored.keys()
+        if actual.get((title_id, score)) != stored.get((title_id, score))
+    })
+
+
+def rebuild_title_scores():
+    """
+    Пересчитывает счётчики оценок и гистограммы всех произведений
+    по таблице отзывов. Возвращает список исправленных произведений.
+    Массовые запросы не вызывают сигналов, поэтому при исправлениях
+    версия каталога сдвигается здесь же.
+    """
+    titles = find_inconsistent_titles()
+    histograms = find_inconsistent_histograms()
+    now = timezone.now()
+    for title in titles:
+        title.score_sum = title.actual_sum
+        title.review_count = title.actual_count
+        title.rating = get_rating(title.score_sum, title.review_count)
+        title.updated_at = now
+    Title.objects.bulk_update(
+        titles, ['score_sum', 'review_count', 'rating', 'updated_at'],
+        batch_size=500
+    )
+    record_changes(Title, [title.id for title in titles], ChangeLog.UPDATED)
+    ScoreCount.objects.all().delete()
+    ScoreCount.objects.bulk_create(
+        ScoreCount(title_id=title_id, score=score, count=count)
+        for (title_id, score), count in get_actual_score_counts().items()
+    )
+    if titles or histograms:
+        bump_version(CATALOG)
+    return titles
+
+
+def rebuild_comment_counts():
+    """
+    Пересчитывает счётчики комментариев отзывов, которые расходятся
+    с таблицей комментариев. Возвращает количество исправленных отзывов.
+    """
+    actual = Coalesce(Subquery(
+        Comment.objects.filter(review=OuterRef('pk')).order_by().values(
+            'review'
+        ).annotate(count=Count('id')).values('count')
+    ), 0)
+    return Review.objects.exclude(comment_count=actual).update(
+        comment_count=actual
+    )
+
+
+def compute_top_titles(size=TOP_TITLES_SIZE):
+    """
+    Лучшие по рейтингу произведения: всего каталога ('all'),
+    каждой категории ('category:<slug>') и каждого жанра ('genre:<slug>').
+    Значения — списки id в порядке убывания рейтинга.
+    """
+    tops = defaultdict(list)
+
+    def add(key, title_id):
+        if len(tops[key]) < size:
+            tops[key].append(title_id)
+
+    for title_id, category in Title.objects.filter(
+        rating__isnull=False
+    ).order_by(*TOP_ORDERING).values_list('id', 'category__slug').iterator():
+        add('all', title_id)
+        if category:
+            add(f'category:{category.lower()}', title_id)
+    for title_id, genre in Title.genre.through.objects.filter(
+        title__rating__isnull=False
+    ).order_by(
+        '-title__rating', '-title__review_count', 'title_id'
+    ).values_list('title_id', 'genre__slug').iterator():
+        add(f'genre:{genre.lower()}', title_id)
+    return dict(tops)
+
+
+def get_top_titles():
+    """
+    Предрасчитанные списки лучших произведений для текущей версии
+    каталога: после изменения отзывов они пересчитываются
+    при первом обращении.
+    """
+    key = f'titles-top:{get_version(CATALOG)}'
+    tops = cache.get(key)
+    if tops is None:
+        tops = compute_top_titles()
+        cache.set(key, tops, timeout=settings.CATALOG_CACHE_TIMEOUT)
+    return tops
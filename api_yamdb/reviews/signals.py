@@ -0,0 +1,195 @@
+import threading
+
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from reviews.models import (
+    Category, ChangeLog, Comment, Genre, Review, Title, User
+)
+from reviews.services import (
+    record_changes, refresh_comment_count, refresh_title_scores,
+    update_comment_count, update_title_scores
+)
+from reviews.versioning import CATALOG, TITLE_INDEX, USERS, bump_version
+
+_state = threading.local()
+
+
+def get_deleting():
+    """Родители, которых удаляет текущий каскад в этом потоке."""
+    if not hasattr(_state, 'deleting'):
+        _state.deleting = set()
+    return _state.deleting
+
+
+def is_deleting(model, pk):
+    return (model, pk) in get_deleting()
+
+
+def get_score(instance):
+    """
+    Оценка отзыва числом: import_data создаёт отзывы из строк CSV,
+    и до перечитывания из базы оценка остаётся строкой.
+    """
+    return Review._meta.get_field('score').to_python(instance.score)
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, **kwargs):
+    """Обновляет счётчики оценок произведения после записи отзыва."""
+    loaded = getattr(instance, '_loaded_values', {})
+    score = get_score(instance)
+    if created:
+        update_title_scores(instance.title_id, added=[score])
+    elif 'title_id' not in loaded or 'score' not in loaded:
+        refresh_title_scores(instance.title_id)
+    elif (loaded['title_id'], loaded['score']) != (
+        instance.title_id, score
+    ):
+        update_title_scores(loaded['title_id'], removed=[loaded['score']])
+        update_title_scores(instance.title_id, added=[score])
+    instance._loaded_values = {
+        'title_id': instance.title_id, 'score': score
+    }
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """
+    Вычитает оценку удалённого отзыва. Если произведение удаляется
+    вместе с отзывом, его счётчики и гистограмма не меняются.
+    """
+    if not is_deleting(Title, instance.title_id):
+        update_title_scores(instance.title_id, removed=[get_score(instance)])
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    """Обновляет счётчик комментариев отзыва после записи комментария."""
+    loaded = getattr(instance, '_loaded_values', {})
+    if created:
+        update_comment_count(instance.review_id, 1)
+    elif 'review_id' not in loaded:
+        refresh_comment_count(instance.review_id)
+    elif loaded['review_id'] != instance.review_id:
+        update_comment_count(loaded['review_id'], -1)
+        update_comment_count(instance.review_id, 1)
+    instance._loaded_values = {'review_id': instance.review_id}
+
+
+@receiver(pre_delete, sender=Title)
+@receiver(pre_delete, sender=Review)
+def parent_deleting(sender, instance, **kwargs):
+    """
+    Каскад удаляет дочерние объекты раньше родителя, и их post_delete
+    видят строку родителя. Родитель помечается, чтобы дочерние объекты
+    не обновляли его счётчики и не записывали его изменения в журнал.
+    """
+    get_deleting().add((sender, instance.pk))
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    """
+    Уменьшает счётчик комментариев отзыва. Если отзыв удаляется
+    вместе с комментарием, счётчик не меняется.
+    """
+    if not is_deleting(Review, instance.review_id):
+        update_comment_count(instance.review_id, -1)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comment)
+def log_saved(sender, instance, created, **kwargs):
+    record_changes(
+        sender, [instance.pk],
+        ChangeLog.CREATED if created else ChangeLog.UPDATED
+    )
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+def log_deleted(sender, instance, **kwargs):
+    """Надгробие для клиентов ленты, в том числе при каскаде."""
+    record_changes(sender, [instance.pk], ChangeLog.DELETED)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def log_genres_changed(sender, instance, action, reverse, pk_set,
+                       **kwargs):
+    """Жанры входят в данные произведения."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        title_ids = [instance.pk]
+    elif pk_set:
+        title_ids = list(pk_set)
+    else:
+        return
+    Title.objects.filter(id__in=title_ids).update(updated_at=timezone.now())
+    record_changes(Title, title_ids, ChangeLog.UPDATED)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+@receiver(m2m_changed, sender=Title.genre.through)
+def catalog_changed(sender, **kwargs):
+    """
+    Любое изменение каталога делает устаревшими закешированные ответы,
+    а изменение состава каталога — ещё и индекс фильтров произведений.
+    """
+    bump_version(CATALOG)
+    if sender is not Review:
+        bump_version(TITLE_INDEX)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def reviews_changed(sender, instance, **kwargs):
+    bump_version('reviews', instance.title_id)
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+def parent_deleted(sender, instance, **kwargs):
+    """
+    Версия списка дочерних объектов меняется и при удалении родителя
+    без них: клиент со старым ETag должен получить 404, а не 304.
+    """
+    bump_version('reviews' if sender is Title else 'comments', instance.pk)
+    get_deleting().discard((sender, instance.pk))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comments_changed(sender, instance, **kwargs):
+    """Число комментариев выводится и в списке отзывов произведения."""
+    bump_version('comments', instance.review_id)
+    if is_deleting(Review, instance.review_id):
+        # Версию отзывов произведения сдвинет удаление самого отзыва.
+        return
+    if Comment.review.is_cached(instance):
+        title_id = instance.review.title_id
+    else:
+        title_id = Review.objects.filter(
+            id=instance.review_id
+        ).values_list('title_id', flat=True).first()
+    if title_id is not None:
+        bump_version('reviews', title_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def users_changed(sender, **kwargs):
+    """Имена авторов выводятся в отзывах и комментариях."""
+    bump_version(USERS)
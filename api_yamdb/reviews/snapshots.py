@@ -0,0 +1,55 @@
+import os
+import sqlite3
+
+from django.core.cache import cache
+from django.db import connection
+
+
+def get_sqlite_connection():
+    """Соединение sqlite3, с которым работает Django."""
+    if connection.vendor != 'sqlite':
+        raise ValueError('Snapshots require the SQLite database backend')
+    connection.ensure_connection()
+    return connection.connection
+
+
+def save_snapshot(path):
+    """
+    Копирует базу целиком в файл через backup API SQLite: страницы
+    копируются как есть, без разбора строк, а копия согласована, даже
+    если база меняется во время копирования. Файл пишется под временным
+    именем и переименовывается по готовности.
+    """
+    source = get_sqlite_connection()
+    temporary = f'{path}.tmp'
+    if os.path.exists(temporary):
+        os.remove(temporary)
+    target = sqlite3.connect(temporary)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+    os.replace(temporary, path)
+
+
+def restore_snapshot(path):
+    """
+    Заменяет содержимое базы снимком, сделанным save_snapshot.
+    Прежде чем писать в базу, проверяет, что файл — снимок базы Django.
+    Затем очищает кеш: закешированные ответы и версии данных относятся
+    к прежнему содержимому базы.
+    """
+    if connection.in_atomic_block:
+        raise ValueError('Cannot restore a snapshot inside a transaction')
+    if not os.path.isfile(path):
+        raise ValueError(f'Snapshot {path} does not exist')
+    source = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        try:
+            source.execute('SELECT app, name FROM django_migrations')
+        except sqlite3.DatabaseError:
+            raise ValueError(f'{path} is not a database snapshot')
+        source.backup(get_sqlite_connection())
+    finally:
+        source.close()
+    cache.clear()
@@ -0,0 +1,39 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+CATALOG = 'catalog'
+TITLE_INDEX = 'title-index'
+USERS = 'users'
+
+
+def get_version_key(*parts):
+    return ':'.join(('version',) + tuple(str(part) for part in parts))
+
+
+def get_version(*parts):
+    """
+    Текущая версия данных с указанным ключом.
+    Начальная версия берётся из часов, поэтому после вытеснения ключа
+    из кеша версия не повторяет уже выданные значения.
+    """
+    key = get_version_key(*parts)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(*parts):
+    """Увеличивает версию после фиксации текущей транзакции."""
+    key = get_version_key(*parts)
+
+    def bump():
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+    transaction.on_commit(bump)
@@ -0,0 +1,28 @@
+# Generated by Django 3.2 on 2026-10-18 17:35
+
+from django.db import migrations, models
+
+
+def fill_username_casefold(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    users = list(User.objects.only('id', 'username'))
+    for user in users:
+        user.username_casefold = user.username.casefold()
+    User.objects.bulk_update(users, ['username_casefold'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_alter_user_username'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='username_casefold',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=450),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_username_casefold, migrations.RunPython.noop),
+    ]
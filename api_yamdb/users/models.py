@@ -28,6 +28,9 @@ class User(AbstractUser):
             'Required. 150 characters or fewer.',
             'Letters, digits and @/./+/-/_ only.'),
         validators=[UsernameValidator()],)
+    username_casefold = models.CharField(
+        max_length=450, db_index=True, editable=False
+    )
     first_name = models.CharField(max_length=150, blank=True)
     last_name = models.CharField(max_length=150, blank=True)
 
@@ -39,6 +42,13 @@ class User(AbstractUser):
     def __str__(self):
         return self.username
 
+    def save(self, *args, **kwargs):
+        self.username_casefold = self.username.casefold()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'username' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'username_casefold'}
+        super().save(*args, **kwargs)
+
     @property
     def is_admin(self):
         return self.role == self.ADMIN or self.is_superuser
@@ -0,0 +1,190 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08Rating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        return response.json().get('rating')
+
+    def test_01_rating_follows_review_writes(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(
+            admin_client, title_id, 'Отлично', 10
+        ).json()
+        create_single_review(user_client, title_id, 'Неплохо', 6)
+        assert self.get_rating(admin_client, title_id) == 8, (
+            'Проверьте, что рейтинг произведения пересчитывается '
+            'при создании отзыва.'
+        )
+
+        admin_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review['id']
+            ),
+            data={'score': 2}
+        )
+        assert self.get_rating(admin_client, title_id) == 4, (
+            'Проверьте, что рейтинг произведения пересчитывается '
+            'при изменении оценки в отзыве.'
+        )
+
+        admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review['id']
+            )
+        )
+        assert self.get_rating(admin_client, title_id) == 6, (
+            'Проверьте, что рейтинг произведения пересчитывается '
+            'при удалении отзыва.'
+        )
+
+    def test_02_rating_follows_cascade_delete(self, admin_client, user_client,
+                                              user):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Отлично', 10)
+        create_single_review(user_client, title_id, 'Плохо', 2)
+        user.delete()
+        assert self.get_rating(admin_client, title_id) == 10, (
+            'Проверьте, что рейтинг произведения пересчитывается, когда '
+            'отзыв удаляется вместе с автором.'
+        )
+
+    def test_03_rebuild_ratings_command(self, admin_client):
+        from reviews.models import Title
+        from reviews.versioning import CATALOG, get_version
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Отлично', 9)
+        call_command('rebuild_ratings', '--check', stdout=StringIO())
+        version = get_version(CATALOG)
+        call_command('rebuild_ratings', stdout=StringIO())
+        assert get_version(CATALOG) == version, (
+            'Проверьте, что команда `rebuild_ratings` не сбрасывает кэш '
+            'каталога, если исправлять нечего.'
+        )
+
+        Title.objects.filter(id=title_id).update(score_sum=1, review_count=5)
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check', stdout=StringIO())
+
+        call_command('rebuild_ratings', stdout=StringIO())
+        assert get_version(CATALOG) != version, (
+            'Проверьте, что команда `rebuild_ratings` сбрасывает кэш '
+            'каталога после исправления рейтингов.'
+        )
+        title = Title.objects.get(id=title_id)
+        assert (title.score_sum, title.review_count) == (9, 1), (
+            'Проверьте, что команда `rebuild_ratings` восстанавливает '
+            'счётчики оценок по отзывам.'
+        )
+        call_command('rebuild_ratings', '--check', stdout=StringIO())
+
+    def test_04_rating_histogram(self, admin_client, user_client,
+                                 moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Отлично', 10)
+        create_single_review(user_client, title_id, 'Отлично', 10)
+        review = create_single_review(
+            moderator_client, title_id, 'Плохо', 3
+        ).json()
+        moderator_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review['id']
+            ),
+            data={'score': 4}
+        )
+        expected = {str(score): 0 for score in range(1, 11)}
+        expected.update({'4': 1, '10': 2})
+
+        url = f'/api/v1/titles/{title_id}/rating-histogram/'
+        response = admin_client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ '
+            'со статусом 200.'
+        )
+        assert response.json()['histogram'] == expected, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'количество отзывов для каждой оценки от 1 до 10.'
+        )
+
+        response = admin_client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id),
+            {'include': 'rating_histogram'}
+        )
+        assert response.json().get('rating_histogram') == expected, (
+            'Проверьте, что гистограмма оценок встраивается в ответ '
+            'по параметру `include=rating_histogram`.'
+        )
+        response = admin_client.get('/api/v1/titles/')
+        assert 'rating_histogram' not in response.json()['results'][0], (
+            'Проверьте, что гистограмма оценок не выводится без запроса.'
+        )
+
+    def test_05_plain_import_keeps_ratings(self):
+        from reviews.models import ChangeLog, ScoreCount, Title
+
+        out = StringIO()
+        call_command('import_data', stdout=out)
+        assert 'Error' not in out.getvalue(), (
+            'Проверьте, что `import_data` загружает static/data без ошибок.'
+        )
+        call_command('rebuild_ratings', '--check', stdout=StringIO())
+        assert Title.objects.get(id=1).review_count > 0
+        assert ScoreCount.objects.exists()
+        assert ChangeLog.objects.filter(
+            model='title', action=ChangeLog.UPDATED
+        ).exists(), (
+            'Проверьте, что при загрузке `import_data` пересчитываются '
+            'рейтинги произведений.'
+        )
+
+    def test_06_title_cascade_skips_scores(self, admin_client,
+                                           django_user_model):
+        from reviews.models import ChangeLog, Comment, Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(id=titles[0]['id'])
+        for idx in range(10):
+            author = django_user_model.objects.create_user(
+                username=f'critic{idx}', email=f'critic{idx}@yamdb.fake'
+            )
+            review = Review.objects.create(
+                title=title, author=author, text='Отзыв', score=idx + 1
+            )
+            for _ in range(5):
+                Comment.objects.create(
+                    review=review, author=author, text='Комментарий'
+                )
+        last_change = ChangeLog.objects.latest('id').id
+
+        admin_client.delete(self.TITLE_DETAIL_URL_TEMPLATE.format(
+            title_id=title.id
+        ))
+        changes = ChangeLog.objects.filter(id__gt=last_change)
+        assert not changes.exclude(action=ChangeLog.DELETED).exists(), (
+            'Проверьте, что отзывы и комментарии, удаляемые вместе '
+            'с произведением, не пересчитывают счётчики произведения '
+            'и отзывов.'
+        )
+        assert changes.count() == 1 + 10 + 50, (
+            'Проверьте, что удаление произведения записывает в ленту '
+            'изменений по одному надгробию на удалённый объект.'
+        )
@@ -0,0 +1,203 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+PAGE_SIZES = (1, 10)
+
+
+def check_query_budget(client, url, budget, method='get', data=None,
+                       **kwargs):
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, data=data, **kwargs)
+        if response.streaming:
+            # Потоковый ответ выполняет запросы по мере чтения.
+            b''.join(response.streaming_content)
+    assert response.status_code in (HTTPStatus.OK, HTTPStatus.CREATED), (
+        f'Проверьте, что {method.upper()}-запрос к `{url}` '
+        'выполняется успешно.'
+    )
+    queries = '\n'.join(query['sql'] for query in context.captured_queries)
+    assert len(context) == budget, (
+        f'Проверьте, что {method.upper()}-запрос к `{url}` выполняет '
+        f'{budget} SQL-запрос(ов), а не {len(context)}:\n{queries}'
+    )
+    return response
+
+
+@pytest.fixture
+def catalog(request, django_user_model, admin, user):
+    from reviews.models import Category, Comment, Genre, Review, Title
+
+    size = getattr(request, 'param', 1)
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(3)
+    ]
+    titles = []
+    for idx in range(size):
+        title = Title.objects.create(
+            name=f'Произведение {idx}', year=2000, category=category
+        )
+        title.genre.set(genres)
+        titles.append(title)
+    review = Review.objects.create(
+        title=titles[0], author=admin, text='Отзыв', score=7
+    )
+    comment = Comment.objects.create(
+        review=review, author=user, text='Комментарий'
+    )
+    authors = [user] + [
+        django_user_model.objects.create_user(
+            username=f'reader{idx}', email=f'reader{idx}@yamdb.fake'
+        )
+        for idx in range(size - 1)
+    ]
+    for author in authors:
+        Review.objects.create(
+            title=titles[0], author=author, text='Отзыв', score=5
+        )
+        Comment.objects.create(
+            review=review, author=author, text='Комментарий'
+        )
+    return {
+        'title': titles[0], 'titles': titles, 'review': review,
+        'comment': comment, 'category': category, 'genre': genres[0],
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryBudget:
+
+    @pytest.mark.parametrize('catalog', PAGE_SIZES, indirect=True)
+    def test_01_titles_list(self, client, catalog):
+        check_query_budget(client, '/api/v1/titles/', 3)
+        check_query_budget(
+            client, '/api/v1/titles/?include=rating_histogram', 4
+        )
+
+    @pytest.mark.parametrize('catalog', PAGE_SIZES, indirect=True)
+    def test_02_categories_and_genres_list(self, client, catalog):
+        check_query_budget(client, '/api/v1/categories/', 2)
+        check_query_budget(client, '/api/v1/genres/', 2)
+
+    def test_03_title_detail(self, client, catalog):
+        url = f'/api/v1/titles/{catalog["title"].id}/'
+        check_query_budget(client, url, 2)
+        check_query_budget(client, f'{url}?include=rating_histogram', 3)
+        check_query_budget(client, f'{url}rating-histogram/', 2)
+
+    @pytest.mark.parametrize('catalog', PAGE_SIZES, indirect=True)
+    def test_04_reviews(self, client, catalog):
+        url = f'/api/v1/titles/{catalog["title"].id}/reviews/'
+        check_query_budget(client, url, 2)
+        check_query_budget(client, f'{url}{catalog["review"].id}/', 1)
+
+    @pytest.mark.parametrize('catalog', PAGE_SIZES, indirect=True)
+    def test_05_comments(self, client, catalog):
+        url = (
+            f'/api/v1/titles/{catalog["title"].id}/reviews/'
+            f'{catalog["review"].id}/comments/'
+        )
+        check_query_budget(client, url, 2)
+        check_query_budget(client, f'{url}{catalog["comment"].id}/', 1)
+
+    def test_06_users(self, admin_client, catalog):
+        check_query_budget(admin_client, '/api/v1/users/', 3)
+        check_query_budget(admin_client, '/api/v1/users/TestUser/', 2)
+        check_query_budget(admin_client, '/api/v1/users/me/', 1)
+
+    def test_07_auth(self, client, user):
+        check_query_budget(
+            client, '/api/v1/auth/signup/', 3, method='post',
+            data={'username': 'new_user', 'email': 'new_user@yamdb.fake'}
+        )
+        check_query_budget(
+            client, '/api/v1/auth/token/', 1, method='post',
+            data={
+                'username': user.username,
+                'confirmation_code': default_token_generator.make_token(user)
+            }
+        )
+
+    def test_08_missing_parent(self, client, catalog):
+        title_id, review_id = catalog['title'].id, catalog['review'].id
+        for url in (
+            '/api/v1/titles/0/reviews/',
+            f'/api/v1/titles/0/reviews/{review_id}/comments/',
+            f'/api/v1/titles/{title_id}/reviews/0/comments/',
+        ):
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что GET-запрос к `{url}` для несуществующего '
+                'родительского объекта возвращает ответ со статусом 404.'
+            )
+
+    @pytest.mark.parametrize('catalog', PAGE_SIZES, indirect=True)
+    def test_09_changes(self, client, catalog):
+        response = check_query_budget(client, '/api/v1/changes/', 5)
+        assert {
+            change['type'] for change in response.json()['results']
+        } == {'title', 'review', 'comment'}, (
+            'Проверьте, что лента изменений содержит произведения, отзывы '
+            'и комментарии.'
+        )
+
+    @pytest.mark.parametrize('catalog', PAGE_SIZES, indirect=True)
+    def test_10_top_titles(self, client, catalog):
+        check_query_budget(client, '/api/v1/titles/top/', 4)
+        check_query_budget(client, '/api/v1/titles/top/', 2)
+        check_query_budget(
+            client, f'/api/v1/titles/top/?genre={catalog["genre"].slug}', 2
+        )
+
+    @pytest.mark.parametrize('catalog', PAGE_SIZES, indirect=True)
+    def test_11_bulk_reviews(self, moderator_client, catalog):
+        # Счётчики оценок обновляются по каждому произведению пачки.
+        check_query_budget(
+            moderator_client, '/api/v1/reviews/bulk/',
+            7 + 6 * len(catalog['titles']), method='post',
+            data=[
+                {'title': title.id, 'text': 'Отзыв', 'score': 6}
+                for title in catalog['titles']
+            ], format='json'
+        )
+
+    @pytest.mark.parametrize('catalog', PAGE_SIZES, indirect=True)
+    def test_12_reviews_export(self, client, catalog):
+        url = f'/api/v1/titles/{catalog["title"].id}/reviews/export/'
+        check_query_budget(client, url, 2)
+        check_query_budget(client, f'{url}?include=comments', 3)
+
+    @pytest.mark.parametrize('catalog', PAGE_SIZES, indirect=True)
+    def test_13_async_views(self, client, catalog, monkeypatch):
+        from api import async_views
+
+        run_view = async_views.run_view
+        queries = []
+
+        def capture_run_view(*args, **kwargs):
+            # Представление выполняется в потоке пула со своим
+            # соединением, поэтому запросы собираются в этом же потоке.
+            with CaptureQueriesContext(connection) as context:
+                response = run_view(*args, **kwargs)
+            queries.extend(query['sql'] for query in context.captured_queries)
+            return response
+
+        monkeypatch.setattr(async_views, 'run_view', capture_run_view)
+        title_url = f'/api/v1/async/titles/{catalog["title"].id}/'
+        for url, budget in (
+            ('/api/v1/async/titles/', 3),
+            (title_url, 2),
+            (f'{title_url}reviews/', 2),
+            (f'{title_url}reviews/{catalog["review"].id}/comments/', 2),
+        ):
+            queries.clear()
+            check_query_budget(client, url, 0)
+            assert len(queries) == budget, (
+                f'Проверьте, что GET-запрос к `{url}` выполняет {budget} '
+                f'SQL-запрос(ов), а не {len(queries)}:\n' + '\n'.join(queries)
+            )
@@ -0,0 +1,224 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10KeysetPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def create_titles(self):
+        from reviews.models import Category, Title
+
+        category = Category.objects.create(name='Фильм', slug='films')
+        titles = [
+            Title.objects.create(
+                name=f'Произведение {idx % 4}', year=1990 + idx % 3,
+                category=category
+            )
+            for idx in range(25)
+        ]
+        return sorted(titles, key=lambda title: (
+            title.year, title.name, title.id
+        ))
+
+    def test_01_titles_cursor_pages(self, client):
+        titles = self.create_titles()
+        url = f'{self.TITLES_URL}?pagination=cursor'
+        received = []
+        page_queries = []
+        while url:
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что GET-запрос к `{url}` возвращает ответ '
+                'со статусом 200.'
+            )
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что при `pagination=cursor` общее количество '
+                'произведений не подсчитывается.'
+            )
+            received.extend(title['id'] for title in data['results'])
+            page_queries.append(len(context))
+            url = data['next']
+
+        assert received == [title.id for title in titles], (
+            'Проверьте, что постраничный обход `/api/v1/titles/` с '
+            '`pagination=cursor` возвращает все произведения по одному разу '
+            'в порядке (year, name, id).'
+        )
+        assert len(set(page_queries)) == 1, (
+            'Проверьте, что каждая страница курсорной пагинации выполняет '
+            'одинаковое количество SQL-запросов.'
+        )
+
+    def test_02_invalid_cursor(self, client):
+        response = client.get(
+            f'{self.TITLES_URL}?pagination=cursor&cursor=broken'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что некорректный курсор приводит к ответу '
+            'со статусом 404.'
+        )
+
+    def test_03_cursor_query_uses_index(self):
+        from api.pagination import TitleKeysetPagination
+        from reviews.models import Title
+
+        paginator = TitleKeysetPagination()
+        paginator.fields = [
+            Title._meta.get_field(name) for name in paginator.ordering
+        ]
+        queryset = Title.objects.filter(
+            paginator.get_seek_filter([1990, 'Произведение', 5])
+        ).order_by(*paginator.ordering)[:10]
+        plan = queryset.explain()
+        assert 'title_year_name_id_idx' in plan, (
+            'Проверьте, что для сортировки (year, name, id) создан '
+            f'составной индекс. План запроса:\n{plan}'
+        )
+        assert 'SEARCH' in plan, (
+            'Проверьте, что курсорная пагинация начинает поиск по индексу '
+            f'с позиции курсора. План запроса:\n{plan}'
+        )
+        assert 'TEMP B-TREE' not in plan, (
+            'Проверьте, что курсорная пагинация не сортирует результаты '
+            f'во временном B-дереве. План запроса:\n{plan}'
+        )
+
+    def create_thread(self, django_user_model):
+        from reviews.models import Category, Comment, Review, Title
+
+        category = Category.objects.create(name='Фильм', slug='films')
+        title = Title.objects.create(name='Фильм', year=2000,
+                                     category=category)
+        authors = [
+            django_user_model.objects.create_user(
+                username=f'reader{idx}', email=f'reader{idx}@yamdb.fake'
+            )
+            for idx in range(15)
+        ]
+        reviews = [
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=5
+            )
+            for author in authors
+        ]
+        comments = [
+            Comment.objects.create(
+                review=reviews[0], author=author, text='Комментарий'
+            )
+            for author in authors
+        ]
+        return title, reviews, comments
+
+    def test_04_thread_cursor_pages(self, client, django_user_model):
+        title, reviews, comments = self.create_thread(django_user_model)
+        reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+        for url, objects in (
+            (reviews_url, reviews),
+            (f'{reviews_url}{reviews[0].id}/comments/', comments),
+        ):
+            received = []
+            url = f'{url}?pagination=cursor'
+            while url:
+                data = client.get(url).json()
+                assert 'count' not in data, (
+                    'Проверьте, что при `pagination=cursor` общее количество '
+                    'записей не подсчитывается.'
+                )
+                received.extend(obj['id'] for obj in data['results'])
+                url = data['next']
+            assert received == [obj.id for obj in reversed(objects)], (
+                'Проверьте, что курсорная пагинация отзывов и комментариев '
+                'возвращает все записи по одному разу от новых к старым.'
+            )
+
+    def test_05_thread_query_uses_index(self, django_user_model):
+        from api.pagination import PubDateKeysetPagination
+        from reviews.models import Comment, Review
+
+        title, reviews, _ = self.create_thread(django_user_model)
+        paginator = PubDateKeysetPagination()
+        for queryset, index in (
+            (Review.objects.filter(title_id=title.id),
+             'review_title_pub_date_idx'),
+            (Comment.objects.filter(
+                review_id=reviews[0].id, review__title_id=title.id
+            ), 'comment_review_pub_date_idx'),
+        ):
+            paginator.fields = [
+                queryset.model._meta.get_field(name.lstrip('-'))
+                for name in paginator.ordering
+            ]
+            position = [reviews[5].pub_date, reviews[5].id]
+            for page in (
+                queryset,
+                queryset.filter(paginator.get_seek_filter(position)),
+            ):
+                plan = page.order_by(*paginator.ordering)[:10].explain()
+                assert index in plan, (
+                    'Проверьте, что для сортировки по (-pub_date, -id) '
+                    f'создан составной индекс. План запроса:\n{plan}'
+                )
+                assert 'TEMP B-TREE' not in plan, (
+                    'Проверьте, что страницы отзывов и комментариев не '
+                    'сортируются во временном B-дереве. '
+                    f'План запроса:\n{plan}'
+                )
+
+    def test_06_cursor_follows_ordering(self, client):
+        from reviews.models import Title
+
+        titles = self.create_titles()
+        for idx, title in enumerate(titles):
+            title.rating = None if idx % 5 == 0 else idx % 7 + 1
+            title.review_count = idx % 4
+            Title.objects.filter(id=title.id).update(
+                rating=title.rating, review_count=title.review_count
+            )
+        for ordering, key in (
+            ('-rating', lambda title: (
+                title.rating is not None, title.rating or 0, title.id
+            )),
+            ('rating', lambda title: (
+                title.rating is not None, title.rating or 0, title.id
+            )),
+            ('-review_count', lambda title: (title.review_count, title.id)),
+            ('name', lambda title: (title.name, title.id)),
+        ):
+            expected = sorted(
+                titles, key=key, reverse=ordering.startswith('-')
+            )
+            url = (
+                f'{self.TITLES_URL}?pagination=cursor&ordering={ordering}'
+            )
+            received = []
+            while url:
+                response = client.get(url)
+                assert response.status_code == HTTPStatus.OK, (
+                    f'Проверьте, что GET-запрос к `{url}` возвращает ответ '
+                    'со статусом 200.'
+                )
+                data = response.json()
+                received.extend(title['id'] for title in data['results'])
+                url = data['next']
+            assert received == [title.id for title in expected], (
+                'Проверьте, что при `pagination=cursor` страницы '
+                f'произведений следуют сортировке `ordering={ordering}` '
+                'и содержат каждое произведение по одному разу.'
+            )
+
+    def test_07_cursor_rejects_search(self, client):
+        self.create_titles()
+        response = client.get(
+            f'{self.TITLES_URL}?pagination=cursor&search=Произведение'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что сортировка по релевантности поиска вместе с '
+            '`pagination=cursor` приводит к ответу со статусом 400.'
+        )
@@ -0,0 +1,82 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11CatalogCache:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_repeated_list_served_from_cache(self, client, admin_client):
+        from api.cache import get_cache_stats
+
+        create_titles(admin_client)
+        response = client.get(self.TITLES_URL, {'year': 1984, 'page': 1})
+        assert response['X-Cache'] == 'MISS'
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                self.TITLES_URL, {'page': 1, 'year': 1984, 'name': ''}
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert response['X-Cache'] == 'HIT', (
+            'Проверьте, что повторный GET-запрос к `/api/v1/titles/` с теми '
+            'же параметрами в другом порядке отдаётся из кеша.'
+        )
+        assert len(context) == 0, (
+            'Проверьте, что ответ из кеша не выполняет SQL-запросов.'
+        )
+        assert response.json()['count'] == 1
+        assert get_cache_stats() == {'hits': 1, 'misses': 1}, (
+            'Проверьте, что ведутся счётчики попаданий и промахов кеша.'
+        )
+
+    def test_02_writes_invalidate_cache(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        detail_url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        assert client.get(detail_url).json()['rating'] is None
+
+        create_single_review(admin_client, titles[0]['id'], 'Текст', 8)
+        response = client.get(detail_url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 8, (
+            'Проверьте, что создание отзыва сбрасывает кеш произведений.'
+        )
+
+        admin_client.post('/api/v1/genres/', {'name': 'Вестерн',
+                                              'slug': 'western'})
+        admin_client.patch(detail_url, {'genre': ['western']})
+        response = client.get(detail_url)
+        assert response.json()['genre'] == [
+            {'name': 'Вестерн', 'slug': 'western'}
+        ], (
+            'Проверьте, что изменение жанров произведения сбрасывает кеш.'
+        )
+
+    def test_03_cache_stats_endpoint(self, client, admin_client,
+                                     user_client):
+        url = '/api/v1/cache-stats/'
+        create_titles(admin_client)
+        client.get(self.TITLES_URL)
+        client.get(self.TITLES_URL)
+        for anonymous_or_user in (client, user_client):
+            response = anonymous_or_user.get(url)
+            assert response.status_code in (
+                HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN
+            ), (
+                f'Проверьте, что `{url}` доступен только администратору.'
+            )
+        response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос администратора к `{url}` '
+            'возвращает ответ со статусом 200.'
+        )
+        assert response.json() == {'hits': 1, 'misses': 1}, (
+            f'Проверьте, что `{url}` возвращает счётчики попаданий '
+            'и промахов кеша ответов каталога.'
+        )
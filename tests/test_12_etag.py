@@ -0,0 +1,115 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import (create_comments, create_single_comment,
+                         create_single_review, create_titles)
+
+
+def check_not_modified(client, url):
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    etag = response.get('ETag')
+    assert etag, (
+        f'Проверьте, что ответ на GET-запрос к `{url}` содержит заголовок '
+        '`ETag`.'
+    )
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        f'Проверьте, что GET-запрос к `{url}` с актуальным `If-None-Match` '
+        'возвращает ответ со статусом 304.'
+    )
+    assert len(context) == 0, (
+        f'Проверьте, что ответ 304 на GET-запрос к `{url}` не выполняет '
+        'SQL-запросов.'
+    )
+    return etag
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ETag:
+
+    def test_01_catalog_endpoints(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        urls = (
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+            '/api/v1/titles/',
+            f'/api/v1/titles/{titles[0]["id"]}/',
+        )
+        etags = {url: check_not_modified(client, url) for url in urls}
+
+        admin_client.post('/api/v1/genres/', {'name': 'Вестерн',
+                                              'slug': 'western'})
+        for url, etag in etags.items():
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что после изменения каталога GET-запрос к '
+                f'`{url}` со старым `If-None-Match` возвращает 200.'
+            )
+
+    def test_02_reviews_and_comments(self, client, admin_client, admin,
+                                     user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        reviews_etag = check_not_modified(client, reviews_url)
+        comments_etag = check_not_modified(client, comments_url)
+        check_not_modified(client, f'{comments_url}{comments[0]["id"]}/')
+
+        create_single_review(user_client, titles[1]['id'], 'Текст', 5)
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=reviews_etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что отзыв к другому произведению не меняет ETag '
+            'списка отзывов.'
+        )
+
+        create_single_review(user_client, titles[0]['id'], 'Текст', 5)
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=reviews_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый отзыв меняет ETag списка отзывов.'
+        )
+
+        create_single_comment(
+            user_client, titles[0]['id'], reviews[0]['id'], 'Текст'
+        )
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=comments_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый комментарий меняет ETag списка '
+            'комментариев.'
+        )
+
+    def test_03_deleted_title_without_reviews(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        etag = check_not_modified(client, reviews_url)
+
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что после удаления произведения без отзывов '
+            'GET-запрос к списку его отзывов со старым `If-None-Match` '
+            'возвращает ответ со статусом 404.'
+        )
+
+    def test_04_deleted_review_without_comments(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            admin_client, titles[0]['id'], 'Текст', 5
+        ).json()
+        review_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/'
+        comments_url = f'{review_url}comments/'
+        etag = check_not_modified(client, comments_url)
+
+        admin_client.delete(review_url)
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что после удаления отзыва без комментариев '
+            'GET-запрос к списку его комментариев со старым '
+            '`If-None-Match` возвращает ответ со статусом 404.'
+        )
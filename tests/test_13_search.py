@@ -0,0 +1,63 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def search(self, client, text):
+        response = client.get(self.TITLES_URL, {'search': text})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос к `/api/v1/titles/` с параметром '
+            '`search` возвращает ответ со статусом 200.'
+        )
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_is_case_insensitive_for_cyrillic(self, client,
+                                                         admin_client):
+        create_titles(admin_client)
+        assert self.search(client, 'ТЕРМИНАТОР') == ['Терминатор'], (
+            'Проверьте, что поиск произведений не зависит от регистра '
+            'кириллических букв.'
+        )
+        assert self.search(client, 'креп') == ['Крепкий орешек'], (
+            'Проверьте, что поиск находит произведения по началу слова.'
+        )
+        assert self.search(client, 'yippie') == ['Крепкий орешек'], (
+            'Проверьте, что поиск выполняется и по описанию произведения.'
+        )
+        assert self.search(client, 'орешек терминатор') == [], (
+            'Проверьте, что в результатах поиска есть все слова запроса.'
+        )
+
+    def test_02_search_index_follows_writes(self, client, admin_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            f'{self.TITLES_URL}{titles[0]["id"]}/', {'name': 'Ёжик в тумане'}
+        )
+        assert self.search(client, 'терминатор') == []
+        assert self.search(client, 'ежик') == ['Ёжик в тумане'], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'произведения и не различает «е» и «ё».'
+        )
+        Title.objects.filter(id=titles[0]['id']).delete()
+        assert self.search(client, 'ёжик') == []
+
+    def test_03_search_ranks_results(self, client, admin_client):
+        from reviews.models import Title
+
+        Title.objects.create(
+            name='Фильм', year=2000, description='О том, как война меняет людей'
+        )
+        Title.objects.create(name='Война и мир', year=1966)
+        assert self.search(client, 'война') == ['Война и мир', 'Фильм'], (
+            'Проверьте, что результаты поиска отсортированы по '
+            'релевантности.'
+        )
@@ -0,0 +1,128 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+def get_results(client, url, params):
+    response = client.get(url, params)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со статусом '
+        '200.'
+    )
+    return response.json()['results']
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14CasefoldSearch:
+
+    def test_01_cyrillic_search_ignores_case(self, client, admin_client):
+        create_titles(admin_client)
+        for url, text, expected in (
+            ('/api/v1/categories/', 'ФИЛЬМ', 'Фильм'),
+            ('/api/v1/genres/', 'ужас', 'Ужасы'),
+        ):
+            names = [
+                item['name'] for item in get_results(
+                    client, url, {'search': text}
+                )
+            ]
+            assert names == [expected], (
+                f'Проверьте, что поиск `{url}?search=` не зависит от '
+                'регистра кириллических букв.'
+            )
+        titles = get_results(client, '/api/v1/titles/', {'name': 'ОРЕШ'})
+        assert [title['name'] for title in titles] == ['Крепкий орешек'], (
+            'Проверьте, что фильтр `name` для `/api/v1/titles/` не зависит '
+            'от регистра кириллических букв.'
+        )
+
+    def test_02_username_search_ignores_case(self, admin_client,
+                                              django_user_model):
+        django_user_model.objects.create_user(
+            username='Читатель', email='reader@yamdb.fake'
+        )
+        users = get_results(admin_client, '/api/v1/users/',
+                            {'search': 'читат'})
+        assert [user['username'] for user in users] == ['Читатель'], (
+            'Проверьте, что поиск пользователей не зависит от регистра '
+            'кириллических букв.'
+        )
+
+    def test_03_casefold_columns_follow_writes(self, admin_client):
+        from reviews.models import Genre
+
+        admin_client.post('/api/v1/genres/', {'name': 'Ужасы',
+                                              'slug': 'horror'})
+        genre = Genre.objects.get(slug='horror')
+        assert genre.name_casefold == 'ужасы'
+        genre.name = 'ТРИЛЛЕР'
+        genre.save(update_fields=['name'])
+        genre.refresh_from_db()
+        assert genre.name_casefold == 'триллер', (
+            'Проверьте, что casefold-копия названия обновляется вместе '
+            'с названием.'
+        )
+
+    def test_04_prefix_lookup_uses_index(self):
+        from reviews.models import Genre
+
+        plan = Genre.objects.filter(name_casefold__prefix='ужа').explain()
+        assert 'SEARCH' in plan and 'INDEX' in plan, (
+            'Проверьте, что поиск по началу названия использует индекс. '
+            f'План запроса:\n{plan}'
+        )
+
+    def test_05_title_name_prefix_filter(self, client, admin_client):
+        create_titles(admin_client)
+        for value, expected in (
+            ('КРЕП', ['Крепкий орешек']),
+            ('крепкий о', ['Крепкий орешек']),
+            ('ореш', []),
+        ):
+            titles = get_results(
+                client, '/api/v1/titles/', {'name__prefix': value}
+            )
+            assert [title['name'] for title in titles] == expected, (
+                'Проверьте, что фильтр `name__prefix` для `/api/v1/titles/` '
+                'находит произведения по началу названия без учёта регистра.'
+            )
+
+    def test_06_prefix_filters(self, client, admin_client,
+                               django_user_model):
+        from reviews.models import Category
+
+        create_titles(admin_client)
+        for url, value, expected in (
+            ('/api/v1/categories/', 'фил', ['Фильм']),
+            ('/api/v1/categories/', 'ильм', []),
+            ('/api/v1/genres/', 'УЖ', ['Ужасы']),
+        ):
+            names = [
+                item['name'] for item in get_results(
+                    client, url, {'name__prefix': value}
+                )
+            ]
+            assert names == expected, (
+                f'Проверьте, что фильтр `name__prefix` для `{url}` находит '
+                'объекты по началу названия без учёта регистра.'
+            )
+        django_user_model.objects.create_user(
+            username='Читатель', email='reader@yamdb.fake'
+        )
+        users = get_results(admin_client, '/api/v1/users/',
+                            {'username__prefix': 'ЧИТ'})
+        assert [user['username'] for user in users] == ['Читатель'], (
+            'Проверьте, что фильтр `username__prefix` находит пользователей '
+            'по началу имени без учёта регистра.'
+        )
+        for queryset in (
+            Category.objects.filter(name_casefold__prefix='фил'),
+            django_user_model.objects.filter(username_casefold__prefix='чит'),
+        ):
+            plan = queryset.explain()
+            assert 'SEARCH' in plan and 'INDEX' in plan, (
+                'Проверьте, что поиск по началу названия использует индекс. '
+                f'План запроса:\n{plan}'
+            )
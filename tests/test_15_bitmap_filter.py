@@ -0,0 +1,66 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+FILTERS = (
+    {'genre': 'horror'},
+    {'genre': 'HORROR', 'category': 'films'},
+    {'genre': 'drama', 'category': 'films'},
+    {'category': 'books', 'year': 1988},
+    {'genre': 'comedy', 'year': 1984, 'name': 'терм'},
+    {'genre': 'unknown'},
+    {'name': 'орешек'},
+)
+
+
+def get_names(client, params):
+    response = client.get('/api/v1/titles/', params)
+    return sorted(title['name'] for title in response.json()['results'])
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15BitmapFilter:
+
+    def test_01_bitmap_backend_matches_database(self, client, admin_client,
+                                                settings):
+        create_titles(admin_client)
+        expected = [get_names(client, params) for params in FILTERS]
+        settings.TITLE_FILTER_BACKEND = 'bitmap'
+        for params, names in zip(FILTERS, expected):
+            assert get_names(client, params) == names, (
+                'Проверьте, что фильтрация произведений через индекс в памяти '
+                f'с параметрами {params} совпадает с фильтрацией в базе.'
+            )
+
+    def test_02_bitmap_backend_skips_joins(self, client, admin_client,
+                                           settings):
+        create_titles(admin_client)
+        settings.TITLE_FILTER_BACKEND = 'bitmap'
+        get_names(client, {'genre': 'drama'})
+        with CaptureQueriesContext(connection) as context:
+            client.get('/api/v1/titles/', {'genre': 'horror', 'page': 1})
+        count_sql, titles_sql = (
+            query['sql'] for query in context.captured_queries[:2]
+        )
+        assert 'reviews_title_genre' not in count_sql + titles_sql, (
+            'Проверьте, что при фильтрации через индекс в памяти запрос '
+            'произведений не соединяется с таблицей жанров.'
+        )
+        assert len(context) == 3
+
+    def test_03_bitmap_index_rebuilds_on_change(self, client, admin_client,
+                                                settings):
+        settings.TITLE_FILTER_BACKEND = 'bitmap'
+        titles, _, _ = create_titles(admin_client)
+        assert get_names(client, {'genre': 'drama'}) == ['Крепкий орешек']
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/', {'genre': ['drama']}
+        )
+        assert get_names(client, {'genre': 'drama'}) == [
+            'Крепкий орешек', 'Терминатор'
+        ], (
+            'Проверьте, что индекс в памяти перестраивается после '
+            'изменения жанров произведения.'
+        )
@@ -0,0 +1,84 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TitleOrdering:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def create_rated_titles(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.post(self.TITLES_URL, {
+            'name': 'Без отзывов', 'year': 2000, 'genre': ['drama'],
+            'category': 'films',
+        })
+        create_single_review(admin_client, titles[0]['id'], 'Текст', 4)
+        create_single_review(admin_client, titles[1]['id'], 'Текст', 9)
+        create_single_review(user_client, titles[1]['id'], 'Текст', 7)
+        return titles
+
+    def get_names(self, client, url, params=None):
+        response = client.get(url, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ '
+            'со статусом 200.'
+        )
+        data = response.json()
+        results = data['results'] if isinstance(data, dict) else data
+        return [title['name'] for title in results]
+
+    def test_01_ordering_param(self, client, admin_client, user_client):
+        self.create_rated_titles(admin_client, user_client)
+        for ordering, expected in (
+            ('-rating', ['Крепкий орешек', 'Терминатор', 'Без отзывов']),
+            ('review_count', ['Без отзывов', 'Терминатор',
+                              'Крепкий орешек']),
+            ('-year', ['Без отзывов', 'Крепкий орешек', 'Терминатор']),
+            ('name', ['Без отзывов', 'Крепкий орешек', 'Терминатор']),
+        ):
+            names = self.get_names(
+                client, self.TITLES_URL, {'ordering': ordering}
+            )
+            assert names == expected, (
+                'Проверьте, что GET-запрос к `/api/v1/titles/` с параметром '
+                f'`ordering={ordering}` сортирует произведения.'
+            )
+
+    def test_02_rating_ordering_uses_index(self):
+        from reviews.models import Title
+
+        plan = Title.objects.order_by('-rating', '-id')[:10].explain()
+        assert 'title_rating_id_idx' in plan and 'TEMP B-TREE' not in plan, (
+            'Проверьте, что сортировка по рейтингу использует индекс. '
+            f'План запроса:\n{plan}'
+        )
+
+    def test_03_top_titles(self, client, admin_client, user_client,
+                           moderator_client):
+        titles = self.create_rated_titles(admin_client, user_client)
+        top_url = f'{self.TITLES_URL}top/'
+        assert self.get_names(client, top_url) == [
+            'Крепкий орешек', 'Терминатор'
+        ], (
+            f'Проверьте, что `{top_url}` возвращает оценённые произведения '
+            'в порядке убывания рейтинга.'
+        )
+        assert self.get_names(client, top_url, {'genre': 'horror'}) == [
+            'Терминатор'
+        ]
+        assert self.get_names(client, top_url, {'category': 'books'}) == [
+            'Крепкий орешек'
+        ]
+
+        create_single_review(user_client, titles[0]['id'], 'Текст', 10)
+        create_single_review(moderator_client, titles[0]['id'], 'Текст', 10)
+        assert self.get_names(client, top_url) == [
+            'Терминатор', 'Крепкий орешек'
+        ], (
+            f'Проверьте, что `{top_url}` пересчитывается после изменения '
+            'отзывов.'
+        )
@@ -0,0 +1,101 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17BulkReviews:
+
+    BULK_URL = '/api/v1/reviews/bulk/'
+
+    def test_01_bulk_results(self, admin_client, user_client):
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        create_single_review(user_client, second, 'Уже есть', 3)
+        response = user_client.post(self.BULK_URL, data=[
+            {'title': first, 'text': 'Отлично', 'score': 10},
+            {'title': second, 'text': 'Повтор', 'score': 5},
+            {'title': first, 'text': 'Дубль в пачке', 'score': 1},
+            {'title': 10 ** 6, 'text': 'Нет произведения', 'score': 5},
+            {'title': first, 'text': 'Неверная оценка', 'score': 11},
+        ], format='json')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что POST-запрос к `{self.BULK_URL}` возвращает '
+            'ответ со статусом 200.'
+        )
+        results = response.json()['results']
+        assert [result['status'] for result in results] == [
+            HTTPStatus.CREATED, HTTPStatus.CONFLICT, HTTPStatus.CONFLICT,
+            HTTPStatus.NOT_FOUND, HTTPStatus.BAD_REQUEST
+        ], (
+            'Проверьте, что пакетная загрузка возвращает результат для '
+            'каждого отзыва в порядке запроса.'
+        )
+        review = Review.objects.get(id=results[0]['id'])
+        assert (review.title_id, review.text) == (first, 'Отлично'), (
+            'Проверьте, что пакетная загрузка возвращает id созданных '
+            'отзывов.'
+        )
+        assert Review.objects.count() == 2, (
+            'Проверьте, что пакетная загрузка сохраняет только корректные '
+            'отзывы.'
+        )
+        title = Title.objects.get(id=first)
+        assert (title.review_count, title.rating) == (1, 10), (
+            'Проверьте, что пакетная загрузка обновляет рейтинг '
+            'произведений.'
+        )
+        assert title.get_rating_histogram()[10] == 1, (
+            'Проверьте, что пакетная загрузка обновляет гистограмму оценок.'
+        )
+
+    def test_02_bulk_query_count(self, user_client, moderator_client):
+        from reviews.models import Category, Title
+
+        category = Category.objects.create(name='Фильм', slug='films')
+        titles = [
+            Title.objects.create(name=f'Фильм {idx}', year=2000,
+                                 category=category)
+            for idx in range(20)
+        ]
+        queries = []
+        for client, batch in (
+            (user_client, titles[:2]), (moderator_client, titles)
+        ):
+            with CaptureQueriesContext(connection) as context:
+                response = client.post(self.BULK_URL, data=[
+                    {'title': title.id, 'text': 'Отзыв', 'score': 7}
+                    for title in batch
+                ], format='json')
+            assert all(
+                result['status'] == HTTPStatus.CREATED
+                for result in response.json()['results']
+            ), 'Проверьте, что пакетная загрузка сохраняет отзывы.'
+            queries.append([
+                query['sql'] for query in context.captured_queries
+                if query['sql'].startswith('INSERT INTO "reviews_review"')
+            ])
+        assert [len(inserts) for inserts in queries] == [1, 1], (
+            'Проверьте, что пакетная загрузка сохраняет отзывы одним '
+            'запросом INSERT.'
+        )
+
+    def test_03_bulk_bad_requests(self, client, user_client):
+        response = client.post(
+            self.BULK_URL, data=[], content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что пакетная загрузка недоступна анонимам.'
+        )
+        response = user_client.post(
+            self.BULK_URL, data={'title': 1}, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что пакетная загрузка ожидает список отзывов.'
+        )
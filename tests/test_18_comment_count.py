@@ -0,0 +1,127 @@
+import pytest
+
+from tests.utils import (
+    create_single_comment, create_single_review, create_titles
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18CommentCount:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENT_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        '{comment_id}/'
+    )
+
+    def get_comment_count(self, client, title_id):
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        )
+        return response.json()['results'][0].get('comment_count')
+
+    def test_01_comment_count_follows_comments(self, admin_client,
+                                               user_client, user):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review_id = create_single_review(
+            admin_client, title_id, 'Отзыв', 5
+        ).json()['id']
+        assert self.get_comment_count(admin_client, title_id) == 0, (
+            'Проверьте, что в списке отзывов выводится поле `comment_count`.'
+        )
+
+        comment = create_single_comment(
+            admin_client, title_id, review_id, 'Комментарий'
+        ).json()
+        create_single_comment(user_client, title_id, review_id, 'Ответ')
+        assert self.get_comment_count(admin_client, title_id) == 2, (
+            'Проверьте, что `comment_count` увеличивается при создании '
+            'комментария.'
+        )
+
+        admin_client.delete(self.COMMENT_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review_id, comment_id=comment['id']
+        ))
+        assert self.get_comment_count(admin_client, title_id) == 1, (
+            'Проверьте, что `comment_count` уменьшается при удалении '
+            'комментария.'
+        )
+
+        user.delete()
+        assert self.get_comment_count(admin_client, title_id) == 0, (
+            'Проверьте, что `comment_count` уменьшается, когда комментарий '
+            'удаляется вместе с автором.'
+        )
+
+    def test_02_failed_comment_write_rolls_back(self, admin_client,
+                                                monkeypatch):
+        from reviews import signals
+        from reviews.models import Comment, Review
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review_id = create_single_review(
+            admin_client, title_id, 'Отзыв', 5
+        ).json()['id']
+        comment = create_single_comment(
+            admin_client, title_id, review_id, 'Комментарий'
+        ).json()
+
+        def fail(*args, **kwargs):
+            raise RuntimeError('Сбой журнала изменений')
+
+        monkeypatch.setattr(signals, 'record_changes', fail)
+        with pytest.raises(RuntimeError):
+            create_single_comment(admin_client, title_id, review_id, 'Ответ')
+        with pytest.raises(RuntimeError):
+            admin_client.delete(self.COMMENT_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review_id,
+                comment_id=comment['id']
+            ))
+        assert list(Comment.objects.values_list('id', flat=True)) == [
+            comment['id']
+        ], (
+            'Проверьте, что создание и удаление комментария выполняются '
+            'в транзакции и откатываются при ошибке.'
+        )
+        assert Review.objects.get(id=review_id).comment_count == 1, (
+            'Проверьте, что `comment_count` не меняется, если запись '
+            'комментария откатилась.'
+        )
+
+    def test_03_review_cascade_skips_comment_count(self, admin_client,
+                                                   user_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.models import ChangeLog
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        queries = {}
+        for client, comments in ((admin_client, 1), (user_client, 20)):
+            review_id = create_single_review(
+                client, title_id, 'Отзыв', 5
+            ).json()['id']
+            for idx in range(comments):
+                create_single_comment(
+                    client, title_id, review_id, f'Комментарий {idx}'
+                )
+            last_change = ChangeLog.objects.latest('id').id
+            with CaptureQueriesContext(connection) as context:
+                client.delete(
+                    f'/api/v1/titles/{title_id}/reviews/{review_id}/'
+                )
+            queries[comments] = len(context)
+            assert not ChangeLog.objects.filter(
+                id__gt=last_change, model='review',
+                action=ChangeLog.UPDATED,
+            ).exists(), (
+                'Проверьте, что комментарии, удаляемые вместе с отзывом, '
+                'не записывают изменение отзыва в ленту изменений.'
+            )
+        assert queries[20] - queries[1] == 19, (
+            'Проверьте, что удаление отзыва выполняет для каждого '
+            'комментария только запись надгробия в ленту изменений.'
+        )
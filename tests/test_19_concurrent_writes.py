@@ -0,0 +1,70 @@
+import pytest
+from rest_framework.exceptions import ValidationError
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19ConcurrentWrites:
+    """
+    Одновременные запросы моделируются чередованием: данные первого
+    запроса уже проверены сериализатором, когда второй успевает сохранить
+    конфликтующую запись. Тестовая база SQLite в памяти не ждёт снятия
+    блокировки, поэтому настоящие потоки здесь не используются.
+    """
+
+    def test_01_concurrent_signup(self, django_user_model):
+        from api.serializers import SignupSerializer
+
+        data = {'username': 'racer', 'email': 'racer@yamdb.fake'}
+        serializer = SignupSerializer(data=data)
+        assert serializer.is_valid(), serializer.errors
+        django_user_model.objects.create_user(
+            username='racer', email='other@yamdb.fake'
+        )
+        with pytest.raises(ValidationError) as error:
+            serializer.save()
+        assert set(error.value.detail) == {'username'}, (
+            'Проверьте, что при одновременной регистрации одного имени '
+            'второй запрос получает ошибку валидации поля `username`, '
+            'а не IntegrityError.'
+        )
+        assert django_user_model.objects.filter(username='racer').count() == 1
+
+    def test_02_concurrent_user_update(self, admin, user):
+        from api.serializers import UserSerializer
+
+        serializer = UserSerializer(
+            user, data={'email': 'taken@yamdb.fake'}, partial=True
+        )
+        assert serializer.is_valid(), serializer.errors
+        admin.email = 'taken@yamdb.fake'
+        admin.save()
+        with pytest.raises(ValidationError) as error:
+            serializer.save()
+        assert set(error.value.detail) == {'email'}, (
+            'Проверьте, что при одновременной смене email на один адрес '
+            'второй запрос получает ошибку валидации поля `email`.'
+        )
+
+    def test_03_concurrent_review(self, admin_client, user):
+        from api.serializers import ReviewSerializer
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(id=titles[0]['id'])
+        serializer = ReviewSerializer(data={'text': 'Отзыв', 'score': 7})
+        assert serializer.is_valid(), serializer.errors
+        Review.objects.create(title=title, author=user, text='Отзыв', score=3)
+        with pytest.raises(ValidationError) as error:
+            serializer.save(author=user, title=title)
+        assert error.value.detail == {'non_field_errors': [
+            'Вы уже оставили отзыв на это произведение.'
+        ]}, (
+            'Проверьте, что повторный отзыв отклоняется с сообщением '
+            '«Вы уже оставили отзыв на это произведение.»'
+        )
+        title.refresh_from_db()
+        assert (Review.objects.count(), title.review_count) == (1, 1), (
+            'Проверьте, что отклонённый отзыв не искажает счётчики рейтинга.'
+        )
@@ -0,0 +1,84 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import (
+    create_single_comment, create_single_review, create_titles
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20AsyncViews:
+
+    def create_thread(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review_id = create_single_review(
+            admin_client, title_id, 'Отзыв', 7
+        ).json()['id']
+        create_single_comment(admin_client, title_id, review_id, 'Ответ')
+        title_url = f'/api/v1/titles/{title_id}/'
+        return [
+            '/api/v1/titles/',
+            title_url,
+            f'{title_url}reviews/',
+            f'{title_url}reviews/{review_id}/comments/',
+        ]
+
+    def test_01_async_views_match_sync(self, admin_client, client):
+        for url in self.create_thread(admin_client):
+            async_url = url.replace('/api/v1/', '/api/v1/async/')
+            response = client.get(async_url)
+            assert response.status_code == 200, (
+                f'Проверьте, что GET-запрос к `{async_url}` возвращает ответ '
+                'со статусом 200.'
+            )
+            expected = client.get(url).json()
+            data = response.json()
+            if 'next' in data:
+                data['next'] = data['next'] and data['next'].replace(
+                    '/async/', '/'
+                )
+            assert data == expected, (
+                f'Проверьте, что `{async_url}` возвращает те же данные, '
+                f'что и `{url}`.'
+            )
+
+    def test_02_async_views_read_only(self, admin_client):
+        url = '/api/v1/async/titles/'
+        response = admin_client.post(url, data={'name': 'Фильм'})
+        assert response.status_code == 405, (
+            f'Проверьте, что `{url}` не принимает POST-запросы.'
+        )
+
+    def test_03_benchmark_command(self, admin_client):
+        self.create_thread(admin_client)
+        out = StringIO()
+        call_command(
+            'benchmark_handlers', '--requests', '4', '--concurrency', '2',
+            '--url', '/api/v1/titles/', stdout=out
+        )
+        rows = out.getvalue().splitlines()[1:]
+        assert [row.split()[:2] for row in rows] == [
+            ['wsgi', '/api/v1/titles/'],
+            ['asgi', '/api/v1/titles/'],
+            ['asgi', '/api/v1/async/titles/'],
+        ], 'Проверьте вывод команды `benchmark_handlers`.'
+        assert all(row.split()[-1] == '0' for row in rows), (
+            'Проверьте, что запросы бенчмарка выполняются без ошибок.'
+        )
+
+    def test_04_async_views_skip_csrf(self, token_admin):
+        from rest_framework.test import APIClient
+
+        url = '/api/v1/async/titles/'
+        client = APIClient(enforce_csrf_checks=True)
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {token_admin["access"]}'
+        )
+        response = client.post(url, data={'name': 'Фильм'})
+        assert response.status_code == 405, (
+            f'Проверьте, что `{url}` освобождён от проверки CSRF, как '
+            'представления DRF, и отвечает на POST-запрос статусом 405.'
+        )
@@ -0,0 +1,138 @@
+import asyncio
+import json
+
+import pytest
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21ReviewsExport:
+
+    def create_thread(self, django_user_model, size):
+        from reviews.models import Category, Comment, Review, Title
+
+        category = Category.objects.create(name='Фильм', slug='films')
+        title = Title.objects.create(name='Фильм', year=2000,
+                                     category=category)
+        reviews = []
+        for idx in range(size):
+            author = django_user_model.objects.create_user(
+                username=f'reader{idx}', email=f'reader{idx}@yamdb.fake'
+            )
+            review = Review.objects.create(
+                title=title, author=author, text=f'Отзыв {idx}', score=5
+            )
+            Comment.objects.create(
+                review=review, author=author, text=f'Ответ {idx}'
+            )
+            reviews.append(review)
+        return title, reviews
+
+    def read_export(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+            assert response.status_code == 200, (
+                f'Проверьте, что GET-запрос к `{url}` возвращает ответ '
+                'со статусом 200.'
+            )
+            assert response.streaming, (
+                f'Проверьте, что `{url}` отдаёт данные потоком.'
+            )
+            assert response['Content-Type'] == 'application/x-ndjson'
+            content = b''.join(response.streaming_content).decode()
+        return [json.loads(line) for line in content.splitlines()], context
+
+    def test_01_export_reviews(self, client, django_user_model):
+        title, reviews = self.create_thread(django_user_model, 5)
+        url = f'/api/v1/titles/{title.id}/reviews/export/'
+        rows, _ = self.read_export(client, url)
+        assert [row['id'] for row in rows] == [
+            review.id for review in reversed(reviews)
+        ], (
+            f'Проверьте, что `{url}` выгружает все отзывы произведения '
+            'по одному в строке.'
+        )
+        assert rows[0]['text'] == 'Отзыв 4' and 'comments' not in rows[0], (
+            'Проверьте, что без `include=comments` комментарии '
+            'не выгружаются.'
+        )
+
+    def test_02_export_with_comments(self, client, django_user_model,
+                                     settings):
+        settings.EXPORT_CHUNK_SIZE = 2
+        title, reviews = self.create_thread(django_user_model, 5)
+        url = f'/api/v1/titles/{title.id}/reviews/export/?include=comments'
+        rows, context = self.read_export(client, url)
+        assert [
+            [comment['text'] for comment in row['comments']] for row in rows
+        ] == [[f'Ответ {idx}'] for idx in reversed(range(5))], (
+            'Проверьте, что с `include=comments` каждый отзыв выгружается '
+            'со своими комментариями.'
+        )
+        comment_queries = [
+            query for query in context.captured_queries
+            if 'FROM "reviews_comment"' in query['sql']
+        ]
+        assert len(comment_queries) == 3, (
+            'Проверьте, что комментарии загружаются одним запросом '
+            'на порцию отзывов.'
+        )
+
+    def test_03_export_missing_title(self, client):
+        response = client.get('/api/v1/titles/0/reviews/export/')
+        assert response.status_code == 404, (
+            'Проверьте, что выгрузка отзывов несуществующего произведения '
+            'возвращает ответ со статусом 404.'
+        )
+
+    def export_under_asgi(self, path, query_string):
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        asyncio.run(ASGIHandler()({
+            'type': 'http', 'method': 'GET', 'path': path,
+            'query_string': query_string, 'headers': [],
+        }, receive, send))
+        assert messages[0]['status'] == 200
+        content = b''.join(
+            message.get('body', b'') for message in messages[1:]
+        ).decode()
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_04_export_under_asgi(self, django_user_model, settings):
+        settings.EXPORT_CHUNK_SIZE = 2
+        title, reviews = self.create_thread(django_user_model, 5)
+        path = f'/api/v1/titles/{title.id}/reviews/export/'
+        rows = self.export_under_asgi(path, b'include=comments')
+        assert [row['id'] for row in rows] == [
+            review.id for review in reversed(reviews)
+        ], (
+            f'Проверьте, что `{path}` отдаёт все отзывы и под ASGI.'
+        )
+        assert rows[0]['comments'][0]['text'] == 'Ответ 4'
+
+    def test_05_single_chunk_export_skips_pool(self, django_user_model,
+                                               settings, monkeypatch):
+        from api import views
+
+        def run_blocking(*args):
+            raise AssertionError(
+                'Проверьте, что выгрузка в одну порцию читается до отправки '
+                'ответа и не блокирует цикл событий под ASGI.'
+            )
+
+        settings.EXPORT_CHUNK_SIZE = 10
+        monkeypatch.setattr(views, 'run_blocking', run_blocking)
+        title, reviews = self.create_thread(django_user_model, 5)
+        path = f'/api/v1/titles/{title.id}/reviews/export/'
+        rows = self.export_under_asgi(path, b'')
+        assert len(rows) == len(reviews), (
+            f'Проверьте, что `{path}` отдаёт все отзывы и под ASGI.'
+        )
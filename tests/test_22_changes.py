@@ -0,0 +1,123 @@
+import pytest
+
+from tests.utils import (
+    create_single_comment, create_single_review, create_titles
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22Changes:
+
+    CHANGES_URL = '/api/v1/changes/'
+
+    def get_changes(self, client, since=None):
+        params = {} if since is None else {'since': since}
+        response = client.get(self.CHANGES_URL, params)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{self.CHANGES_URL}` возвращает '
+            'ответ со статусом 200.'
+        )
+        return response.json()
+
+    def summary(self, data):
+        return {
+            (entry['type'], entry['id']): entry['action']
+            for entry in data['results']
+        }
+
+    def test_01_changes_feed(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        data = self.get_changes(admin_client)
+        assert self.summary(data) == {
+            ('title', title['id']): 'created' for title in titles
+        }, (
+            'Проверьте, что лента изменений содержит созданные произведения.'
+        )
+        assert data['results'][0]['data']['name'] == titles[0]['name'], (
+            'Проверьте, что лента изменений содержит текущие данные объекта.'
+        )
+        cursor = data['next']
+
+        review = create_single_review(
+            user_client, title_id, 'Отзыв', 8
+        ).json()
+        comment = create_single_comment(
+            admin_client, title_id, review['id'], 'Комментарий'
+        ).json()
+        data = self.get_changes(admin_client, cursor)
+        assert self.summary(data) == {
+            ('title', title_id): 'updated',
+            ('review', review['id']): 'created',
+            ('comment', comment['id']): 'created',
+        }, (
+            'Проверьте, что лента с курсором содержит только новые '
+            'изменения, а изменения одного объекта сворачиваются.'
+        )
+        entries = {
+            (entry['type'], entry['id']): entry for entry in data['results']
+        }
+        assert entries['title', title_id]['data']['rating'] == 8
+        assert entries['review', review['id']]['data']['title'] == title_id
+        assert entries['review', review['id']]['data']['comment_count'] == 1
+        assert (
+            entries['comment', comment['id']]['data']['review']
+            == review['id']
+        )
+        sequences = [entry['sequence'] for entry in data['results']]
+        assert sequences == sorted(sequences), (
+            'Проверьте, что изменения выводятся в порядке фиксации.'
+        )
+        cursor = data['next']
+
+        admin_client.delete(f'/api/v1/titles/{title_id}/')
+        data = self.get_changes(admin_client, cursor)
+        assert self.summary(data) == {
+            ('title', title_id): 'deleted',
+            ('review', review['id']): 'deleted',
+            ('comment', comment['id']): 'deleted',
+        }, (
+            'Проверьте, что удаление объекта, в том числе каскадное, '
+            'попадает в ленту надгробием.'
+        )
+        assert all('data' not in entry for entry in data['results'])
+        data = self.get_changes(admin_client, data['next'])
+        assert data['results'] == [] and not data['has_more'], (
+            'Проверьте, что после последнего изменения лента пуста.'
+        )
+
+    def test_02_changes_pages(self, admin_client, settings):
+        settings.CHANGES_PAGE_SIZE = 2
+        titles, _, _ = create_titles(admin_client)
+        received = []
+        data = {'next': None, 'has_more': True}
+        while data['has_more']:
+            data = self.get_changes(admin_client, data['next'])
+            received.extend(entry['id'] for entry in data['results'])
+        assert received == [title['id'] for title in titles], (
+            'Проверьте, что лента изменений возобновляется с курсора '
+            'и возвращает все изменения по одному разу.'
+        )
+
+    def test_03_changes_bad_cursor(self, client):
+        response = client.get(self.CHANGES_URL, {'since': 'abc'})
+        assert response.status_code == 400, (
+            'Проверьте, что некорректный курсор ленты изменений приводит '
+            'к ответу со статусом 400.'
+        )
+
+    def test_04_changes_bulk_reviews(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        cursor = self.get_changes(admin_client)['next']
+        results = user_client.post('/api/v1/reviews/bulk/', data=[
+            {'title': title['id'], 'text': 'Отзыв', 'score': 5}
+            for title in titles
+        ], format='json').json()['results']
+        summary = self.summary(self.get_changes(admin_client, cursor))
+        assert all(
+            summary.get(('review', result['id'])) == 'created'
+            for result in results
+        ), (
+            'Проверьте, что отзывы из пакетной загрузки попадают в ленту '
+            'изменений.'
+        )
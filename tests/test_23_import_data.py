@@ -0,0 +1,440 @@
+import csv
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+
+def write_csv(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerows(rows)
+
+
+def write_dataset(directory, reviews=None):
+    """Небольшая выгрузка в формате static/data."""
+    write_csv(directory / 'users.csv', [
+        ('id', 'username', 'email', 'role', 'bio', 'first_name',
+         'last_name'),
+        (100, 'Reader', 'reader@yamdb.fake', 'user', '', '', ''),
+        (101, 'critic', 'critic@yamdb.fake', 'user', '', '', ''),
+    ])
+    write_csv(directory / 'category.csv', [
+        ('id', 'name', 'slug'), (1, 'Фильм', 'movie'),
+    ])
+    write_csv(directory / 'genre.csv', [
+        ('id', 'name', 'slug'), (1, 'Драма', 'drama'),
+    ])
+    write_csv(directory / 'titles.csv', [
+        ('id', 'name', 'year', 'category'),
+        (1, 'Побег из Шоушенка', 1994, 1),
+        (2, 'Крёстный отец', 1972, 1),
+    ])
+    write_csv(directory / 'genre_title.csv', [
+        ('id', 'title_id', 'genre_id'), (1, 1, 1), (2, 2, 1),
+    ])
+    write_csv(directory / 'review.csv', [
+        ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+    ] + (reviews or [
+        (1, 1, 'Отлично', 100, 10, '2019-09-24T21:08:21.567Z'),
+        (2, 1, 'Хорошо', 101, 6, '2019-09-25T21:08:21.567Z'),
+    ]))
+    write_csv(directory / 'comments.csv', [
+        ('id', 'review_id', 'text', 'author', 'pub_date'),
+        (1, 1, 'Согласен', 101, '2020-01-13T23:20:02.422Z'),
+    ])
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23ImportData:
+
+    def test_01_bulk_import(self):
+        from reviews.models import Comment, Review, Title, User
+
+        out = StringIO()
+        call_command('import_data', '--bulk', stdout=out)
+        output = out.getvalue()
+        assert 'rows/s' in output and 'Imported all data' in output, (
+            'Проверьте, что `import_data --bulk` выводит скорость загрузки '
+            'каждого файла.'
+        )
+        assert (
+            User.objects.count(), Title.objects.count(),
+            Title.genre.through.objects.count(), Review.objects.count(),
+            Comment.objects.count()
+        ) == (5, 32, 42, 72, 3), (
+            'Проверьте, что `import_data --bulk` загружает все файлы '
+            'из static/data.'
+        )
+        call_command('rebuild_ratings', '--check', stdout=StringIO())
+        review = Review.objects.get(id=1)
+        assert review.pub_date.isoformat().startswith('2019-09-24T21:08'), (
+            'Проверьте, что при загрузке сохраняются даты публикации '
+            'из выгрузки.'
+        )
+        assert Review.objects.get(id=6).comment_count == 3, (
+            'Проверьте, что после загрузки пересчитываются счётчики '
+            'комментариев.'
+        )
+        title = Title.objects.get(id=1)
+        assert title.name_casefold == title.name.casefold(), (
+            'Проверьте, что при загрузке заполняются casefold-копии названий.'
+        )
+
+    def test_02_bulk_import_query_count(self, django_assert_max_num_queries):
+        with django_assert_max_num_queries(60):
+            call_command('import_data', '--bulk', stdout=StringIO())
+
+    def test_03_bad_rows_are_skipped(self, tmp_path):
+        from reviews.dataset import BulkLoader
+        from reviews.models import Review, Title
+
+        write_dataset(tmp_path, reviews=[
+            (1, 1, 'Отлично', 100, 10, '2019-09-24T21:08:21.567Z'),
+            (2, 3, 'Нет произведения', 100, 5, '2019-09-24T21:08:21.567Z'),
+            (3, 1, 'Повтор', 100, 1, '2019-09-24T21:08:21.567Z'),
+            (4, 2, 'Без оценки', 100, '', '2019-09-24T21:08:21.567Z'),
+        ])
+        errors = []
+        BulkLoader(
+            source_dir=tmp_path,
+            error=lambda table, line, error: errors.append((str(table), line))
+        ).load()
+        assert errors == [
+            ('review.csv', 3), ('review.csv', 4), ('review.csv', 5)
+        ], (
+            'Проверьте, что строки с несуществующими ссылками, повторами '
+            'и некорректными значениями пропускаются с ошибкой.'
+        )
+        assert list(Review.objects.values_list('id', flat=True)) == [1]
+        assert Title.objects.get(id=1).rating == 10
+
+    def test_04_resume_from_checkpoint(self, tmp_path, monkeypatch):
+        from reviews.dataset import BulkLoader, read_checkpoint
+        from reviews.models import Review, Title
+
+        write_dataset(tmp_path, reviews=[
+            (1, 1, 'Отлично,\nмногострочный отзыв', 100, 10,
+             '2019-09-24T21:08:21.567Z'),
+            (2, 1, 'Хорошо', 101, 6, '2019-09-25T21:08:21.567Z'),
+            (3, 2, 'Неплохо', 100, 7, '2019-09-26T21:08:21.567Z'),
+        ])
+        checkpoint = tmp_path / 'checkpoint.json'
+        write = BulkLoader.write
+
+        def crash_on_second_review(loader, table, batch):
+            if str(table) == 'review.csv' and Review.objects.exists():
+                raise RuntimeError('Сбой загрузки')
+            return write(loader, table, batch)
+
+        monkeypatch.setattr(BulkLoader, 'write', crash_on_second_review)
+        with pytest.raises(RuntimeError):
+            BulkLoader(
+                source_dir=tmp_path, batch_size=1, checkpoint=checkpoint
+            ).load()
+        state = read_checkpoint(checkpoint)
+        assert state['titles.csv']['done'] and not state['review.csv']['done']
+        assert state['review.csv']['line'] == 4, (
+            'Проверьте, что контрольная точка указывает на строку после '
+            'последней зафиксированной порции.'
+        )
+        assert list(Review.objects.values_list('id', flat=True)) == [1]
+
+        monkeypatch.setattr(BulkLoader, 'write', write)
+        errors = []
+        BulkLoader(
+            source_dir=tmp_path, batch_size=1, checkpoint=checkpoint,
+            error=lambda *args: errors.append(args)
+        ).load()
+        assert errors == [], (
+            'Проверьте, что повторный запуск продолжает загрузку '
+            'с контрольной точки, не перечитывая загруженные строки.'
+        )
+        assert list(
+            Review.objects.order_by('id').values_list('id', flat=True)
+        ) == [1, 2, 3]
+        assert Review.objects.get(id=1).text == (
+            'Отлично,\nмногострочный отзыв'
+        )
+        assert Title.objects.get(id=1).rating == 8, (
+            'Проверьте, что после продолжения загрузки пересчитываются '
+            'рейтинги.'
+        )
+
+    def test_05_import_with_checkpoint(self, tmp_path):
+        from reviews.models import Comment
+
+        write_dataset(tmp_path)
+        checkpoint = tmp_path / 'checkpoint.json'
+        out = StringIO()
+        call_command(
+            'import_data', '--source-dir', str(tmp_path),
+            '--checkpoint', str(checkpoint), '--batch-size', '1', stdout=out
+        )
+        output = out.getvalue()
+        assert 'ETA' in output and 'Imported all data' in output, (
+            'Проверьте, что `import_data --checkpoint` выводит ход загрузки '
+            'с оценкой оставшегося времени.'
+        )
+        assert Comment.objects.count() == 1
+
+        out = StringIO()
+        call_command(
+            'import_data', '--source-dir', str(tmp_path),
+            '--checkpoint', str(checkpoint), stdout=out
+        )
+        assert 'Error' not in out.getvalue(), (
+            'Проверьте, что повторный запуск завершённой загрузки '
+            'ничего не загружает заново.'
+        )
+
+    def test_06_import_with_workers(self):
+        from reviews.models import Comment, Review, Title, User
+
+        out = StringIO()
+        call_command('import_data', '--workers', '2', stdout=out)
+        assert 'Imported all data' in out.getvalue()
+        assert (
+            User.objects.count(), Title.objects.count(),
+            Title.genre.through.objects.count(), Review.objects.count(),
+            Comment.objects.count()
+        ) == (5, 32, 42, 72, 3), (
+            'Проверьте, что `import_data --workers` загружает те же данные, '
+            'что и загрузка в одном процессе.'
+        )
+        call_command('rebuild_ratings', '--check', stdout=StringIO())
+
+    def test_07_benchmark_import(self, tmp_path):
+        from reviews.management.commands.benchmark_import import (
+            generate_dataset
+        )
+        from reviews.models import Review
+
+        rows = generate_dataset(tmp_path, 3, 4, 2, 1)
+        with open(tmp_path / 'review.csv', encoding='utf-8') as file:
+            assert len(file.readlines()) == 1 + 4 * 2
+        out = StringIO()
+        call_command(
+            'benchmark_import', '--users', '3', '--titles', '4',
+            '--reviews-per-title', '2', '--workers', '0', '--workers', '2',
+            stdout=out
+        )
+        output = out.getvalue()
+        assert f'Generated {rows} rows' in output and 'rows/s' in output, (
+            'Проверьте, что `benchmark_import` выводит скорость загрузки '
+            'для каждого числа процессов.'
+        )
+        assert not Review.objects.exists(), (
+            'Проверьте, что `benchmark_import` не оставляет данных в базе.'
+        )
+
+    def test_08_validate_only(self, tmp_path):
+        from reviews.models import Review, Title, User
+
+        write_dataset(tmp_path, reviews=[
+            (1, 1, 'Отлично', 100, 10, '2019-09-24T21:08:21.567Z'),
+            (2, 1, 'Слишком', 101, 11, '2019-09-24T21:08:21.567Z'),
+            (3, 3, 'Из будущего', 100, 5, '2019-09-24T21:08:21.567Z'),
+            (4, 1, 'Повтор', 100, 5, '2019-09-24T21:08:21.567Z'),
+            (5, 2, 'Без автора', 102, 5, '2019-09-24T21:08:21.567Z'),
+        ])
+        write_csv(tmp_path / 'users.csv', [
+            ('id', 'username', 'email', 'role', 'bio', 'first_name',
+             'last_name'),
+            (100, 'Reader', 'reader@yamdb.fake', 'user', '', '', ''),
+            (101, 'critic', 'critic@yamdb.fake', 'user', '', '', ''),
+            (102, 'me', 'me@yamdb.fake', 'user', '', '', ''),
+        ])
+        write_csv(tmp_path / 'titles.csv', [
+            ('id', 'name', 'year', 'category'),
+            (1, 'Побег из Шоушенка', 1994, 1),
+            (2, 'Крёстный отец', 1972, 1),
+            (3, 'Из будущего', 3000, 1),
+        ])
+        report = tmp_path / 'report.json'
+        with pytest.raises(CommandError):
+            call_command(
+                'import_data', '--validate-only', '--source-dir',
+                str(tmp_path), '--report', str(report), stdout=StringIO()
+            )
+        with open(report, encoding='utf-8') as file:
+            data = json.load(file)
+        assert [
+            (error['file'], error['line']) for error in data['errors']
+        ] == [
+            ('users.csv', 4), ('titles.csv', 4), ('review.csv', 3),
+            ('review.csv', 4), ('review.csv', 5), ('review.csv', 6),
+        ], (
+            'Проверьте, что `import_data --validate-only` находит '
+            'недопустимые имена, годы и оценки, несуществующие ссылки '
+            'и повторные отзывы.'
+        )
+        files = data['files']
+        assert (files['review.csv']['rows'], files['review.csv']['errors']) == (
+            1, 4
+        )
+        assert not (
+            User.objects.exists() or Title.objects.exists()
+            or Review.objects.exists()
+        ), (
+            'Проверьте, что `import_data --validate-only` ничего не '
+            'записывает в базу.'
+        )
+
+    def test_09_validate_only_clean_dump(self, tmp_path):
+        from reviews.models import Review
+
+        write_dataset(tmp_path)
+        out = StringIO()
+        call_command(
+            'import_data', '--validate-only', '--source-dir', str(tmp_path),
+            stdout=out
+        )
+        assert 'Validated all data' in out.getvalue()
+        assert not Review.objects.exists()
+
+    def upsert(self, directory):
+        out = StringIO()
+        call_command(
+            'import_data', '--upsert', '--source-dir', str(directory),
+            stdout=out
+        )
+        return out.getvalue()
+
+    def test_10_upsert_writes_changes_only(self, tmp_path):
+        from reviews.models import ChangeLog, Comment, Review, Title
+
+        write_dataset(tmp_path)
+        output = self.upsert(tmp_path)
+        assert 'Upserted review.csv: 2 created, 0 updated, 0 deleted' in (
+            output
+        )
+        last_change = ChangeLog.objects.latest('id').id
+
+        output = self.upsert(tmp_path)
+        assert output.count('0 created, 0 updated, 0 deleted') == 7, (
+            'Проверьте, что повторная загрузка неизменившейся выгрузки '
+            'в режиме `--upsert` ничего не записывает.'
+        )
+        assert ChangeLog.objects.latest('id').id == last_change
+
+        write_dataset(tmp_path, reviews=[
+            (1, 1, 'Отлично', 100, 10, '2019-09-24T21:08:21.567Z'),
+            (2, 1, 'Так себе', 101, 2, '2019-09-25T21:08:21.567Z'),
+            (3, 2, 'Классика', 100, 9, '2019-09-26T21:08:21.567Z'),
+        ])
+        write_csv(tmp_path / 'comments.csv', [
+            ('id', 'review_id', 'text', 'author', 'pub_date'),
+        ])
+        output = self.upsert(tmp_path)
+        assert 'Upserted review.csv: 1 created, 1 updated, 0 deleted' in (
+            output
+        ) and 'Upserted comments.csv: 0 created, 0 updated, 1 deleted' in (
+            output
+        ) and 'Upserted titles.csv: 0 created, 0 updated, 0 deleted' in (
+            output
+        ), (
+            'Проверьте, что `--upsert` вставляет новые строки, обновляет '
+            'изменившиеся и удаляет пропавшие из выгрузки.'
+        )
+        assert Review.objects.get(id=2).text == 'Так себе'
+        assert not Comment.objects.exists()
+        assert (
+            Title.objects.get(id=1).rating, Title.objects.get(id=2).rating,
+            Review.objects.get(id=1).comment_count
+        ) == (6, 9, 0), (
+            'Проверьте, что после `--upsert` пересчитываются рейтинги '
+            'и счётчики комментариев затронутых объектов.'
+        )
+        call_command('rebuild_ratings', '--check', stdout=StringIO())
+        changes = set(ChangeLog.objects.filter(
+            id__gt=last_change
+        ).values_list('model', 'object_id', 'action'))
+        assert {
+            ('review', 2, 'updated'), ('review', 3, 'created'),
+            ('comment', 1, 'deleted'),
+        } <= changes, (
+            'Проверьте, что изменения из `--upsert` попадают в журнал.'
+        )
+
+    def test_11_upsert_after_bulk_import(self, tmp_path):
+        from reviews.models import Category, Title
+
+        write_dataset(tmp_path)
+        call_command(
+            'import_data', '--bulk', '--source-dir', str(tmp_path),
+            stdout=StringIO()
+        )
+        title = Title.objects.create(
+            name='Не из выгрузки', year=2000,
+            category=Category.objects.get(id=1)
+        )
+        output = self.upsert(tmp_path)
+        assert output.count('0 created, 0 updated, 0 deleted') == 7, (
+            'Проверьте, что `--upsert` после загрузки в режиме `--bulk` '
+            'не переписывает неизменившиеся строки.'
+        )
+        assert Title.objects.filter(id=title.id).exists(), (
+            'Проверьте, что `--upsert` не удаляет объекты, которые '
+            'не загружались из выгрузки.'
+        )
+
+    def test_12_upsert_after_api_delete(self, tmp_path):
+        from reviews.models import Comment, ImportFingerprint, Review, Title
+
+        write_dataset(tmp_path)
+        call_command(
+            'import_data', '--bulk', '--source-dir', str(tmp_path),
+            stdout=StringIO()
+        )
+        Title.objects.get(id=1).delete()
+        output = self.upsert(tmp_path)
+        assert 'Upserted titles.csv: 1 created, 0 updated, 0 deleted' in (
+            output
+        ) and 'Upserted review.csv: 2 created, 0 updated, 0 deleted' in (
+            output
+        ), (
+            'Проверьте, что `--upsert` заново загружает строки объектов, '
+            'удалённых через API или каскадом.'
+        )
+        assert (
+            Review.objects.filter(title_id=1).count(), Comment.objects.count()
+        ) == (2, 1)
+        assert ImportFingerprint.objects.filter(
+            table='review.csv'
+        ).count() == 2
+        call_command('rebuild_ratings', '--check', stdout=StringIO())
+
+        Title.objects.get(id=2).delete()
+        call_command(
+            'import_data', '--bulk', '--source-dir', str(tmp_path),
+            stdout=StringIO()
+        )
+        assert Title.objects.filter(id=2).exists(), (
+            'Проверьте, что `--bulk` загружает строки объектов, удалённых '
+            'после прошлой загрузки.'
+        )
+
+    def test_13_upsert_reuses_released_keys(self, tmp_path):
+        from reviews.models import User
+
+        write_dataset(tmp_path)
+        self.upsert(tmp_path)
+        write_csv(tmp_path / 'users.csv', [
+            ('id', 'username', 'email', 'role', 'bio', 'first_name',
+             'last_name'),
+            (101, 'Editor', 'editor@yamdb.fake', 'user', '', '', ''),
+            (100, 'critic', 'critic@yamdb.fake', 'user', '', '', ''),
+            (102, 'Reader', 'reader@yamdb.fake', 'user', '', '', ''),
+        ])
+        output = self.upsert(tmp_path)
+        assert 'Error' not in output and (
+            'Upserted users.csv: 1 created, 2 updated, 0 deleted' in output
+        ), (
+            'Проверьте, что `--upsert` освобождает прежние username и email '
+            'обновлённой строки и их могут занять следующие строки.'
+        )
+        assert dict(User.objects.values_list('id', 'username')) == {
+            100: 'critic', 101: 'Editor', 102: 'Reader',
+        }
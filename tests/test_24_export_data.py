@@ -0,0 +1,78 @@
+import csv
+import os
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_single_review, create_titles
+
+DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'api_yamdb', 'static', 'data'
+)
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8-sig', newline='') as file:
+        return sorted(csv.DictReader(file), key=lambda row: int(row['id']))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24ExportData:
+
+    def export(self, directory):
+        out = StringIO()
+        call_command(
+            'export_data', '--target-dir', str(directory), '--chunk-size',
+            '2', stdout=out
+        )
+        return out.getvalue()
+
+    def test_01_export_mirrors_static_data(self, tmp_path):
+        call_command('import_data', '--bulk', stdout=StringIO())
+        output = self.export(tmp_path)
+        assert 'Exported all data' in output
+        for filename in sorted(os.listdir(DATA_DIR)):
+            expected = read_csv(os.path.join(DATA_DIR, filename))
+            exported = read_csv(tmp_path / filename)
+            if filename == 'titles.csv':
+                assert all(row.pop('description') == '' for row in exported)
+            assert exported == expected, (
+                f'Проверьте, что `export_data` выгружает {filename} '
+                'в формате static/data.'
+            )
+
+    def test_02_export_import_round_trip(self, tmp_path, admin_client,
+                                         user_client):
+        from reviews.models import Category, Comment, Genre, Review, Title
+        from reviews.models import User
+
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 7)
+        expected = (
+            list(Title.objects.order_by('id').values_list(
+                'id', 'name', 'year', 'category_id', 'description', 'rating'
+            )),
+            list(Review.objects.values_list(
+                'id', 'title_id', 'author_id', 'score', 'text', 'pub_date'
+            )),
+        )
+        self.export(tmp_path)
+        for model in (Comment, Review, Title, Genre, Category, User):
+            model.objects.all().delete()
+        call_command(
+            'import_data', '--bulk', '--source-dir', str(tmp_path),
+            stdout=StringIO()
+        )
+        assert (
+            list(Title.objects.order_by('id').values_list(
+                'id', 'name', 'year', 'category_id', 'description', 'rating'
+            )),
+            list(Review.objects.values_list(
+                'id', 'title_id', 'author_id', 'score', 'text', 'pub_date'
+            )),
+        ) == expected, (
+            'Проверьте, что данные, выгруженные `export_data`, загружаются '
+            '`import_data` без потерь.'
+        )
@@ -0,0 +1,51 @@
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Snapshots:
+
+    def test_01_snapshot_and_restore(self, tmp_path):
+        from reviews.models import Review, Title
+
+        call_command('import_data', '--bulk', stdout=StringIO())
+        snapshot = tmp_path / 'snapshot.sqlite3'
+        out = StringIO()
+        call_command('snapshot_data', str(snapshot), stdout=out)
+        assert 'Saved snapshot' in out.getvalue()
+
+        Title.objects.filter(id__in=[1, 2]).delete()
+        Review.objects.all().delete()
+        cache.set('stale', 'value')
+        out = StringIO()
+        call_command('restore_data', str(snapshot), stdout=out)
+        output = out.getvalue()
+        assert 'Restored snapshot' in output, (
+            'Проверьте, что `restore_data` сообщает о восстановлении.'
+        )
+        assert 'unapplied migrations' not in output
+        assert (Title.objects.count(), Review.objects.count()) == (32, 72), (
+            'Проверьте, что `restore_data` возвращает базу к состоянию '
+            'на момент снимка.'
+        )
+        call_command('rebuild_ratings', '--check', stdout=StringIO())
+        assert cache.get('stale') is None, (
+            'Проверьте, что после восстановления снимка очищается кеш.'
+        )
+
+    def test_02_restore_rejects_other_files(self, tmp_path):
+        from reviews.models import Title
+
+        call_command('import_data', '--bulk', stdout=StringIO())
+        path = tmp_path / 'titles.csv'
+        path.write_text('id,name\n1,Фильм\n', encoding='utf-8')
+        for snapshot in (path, tmp_path / 'missing.sqlite3'):
+            with pytest.raises(CommandError):
+                call_command('restore_data', str(snapshot), stdout=StringIO())
+        assert Title.objects.count() == 32, (
+            'Проверьте, что `restore_data` не меняет базу, если файл '
+            'не является снимком.'
+        )